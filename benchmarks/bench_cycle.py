@@ -0,0 +1,218 @@
+"""Offline benchmark of a full sync cycle against fake Canvas and Keep backends
+
+Times get_assignments, gen_update_todo_dict and post_todo_state, and reports latency, request count
+and peak memory of each phase, followed by the whole streamed cycle (CanvasTodo.sync), where diffing
+and posting of each course overlaps fetching of the others. Run from the repository root with
+`python -m benchmarks.bench_cycle [--sizes 10 1000 50000] [--latency 0.001] [--no-memory]
+[--backend sqlite]`
+
+Memory tracing slows every phase down, pass --no-memory for undistorted latencies
+"""
+import os
+import argparse
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Tuple
+
+from canvas_todo.assignments import get_assignments
+from canvas_todo.canvas_todo import CanvasTodo
+from canvas_todo.metrics import NullMetrics
+from canvas_todo.scheduler import Scheduler
+from canvas_todo.todo import TodoBase, SqliteTodo
+
+from .fakes import FakeCanvas, FakeKeep, FakeUser
+
+
+N_COURSES = 5
+ASSIGNMENTS_CONF = {"due_date_horizon": 21}
+
+
+TRACE_MEMORY = True
+
+
+def measure(func: Callable) -> Tuple[object, float, float]:
+    """Runs function, measuring wall time and peak traced memory
+
+    Parameters
+    ----------
+    func : Callable
+        function to run
+
+    Returns
+    -------
+    Tuple[object, float, float]
+        result of function, seconds taken, peak memory in MB (nan if not traced)
+    """
+    if TRACE_MEMORY:
+        tracemalloc.start()
+
+    start = perf_counter()
+    result = func()
+    elapsed = perf_counter() - start
+
+    peak = float("nan")
+    if TRACE_MEMORY:
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def make_todo(backend: str, latency: float, tmp_dir: str) -> TodoBase:
+    """Builds empty todo backend
+
+    Parameters
+    ----------
+    backend : str
+        todo backend (gkeep, sqlite)
+    latency : float
+        seconds each fake keep sync takes
+    tmp_dir : str
+        temporary directory to create sqlite database in
+
+    Returns
+    -------
+    TodoBase
+        fake google keep, or sqlite todo list in a fresh database
+    """
+    if backend == "sqlite":
+        fd, path = tempfile.mkstemp(suffix=".db", dir=tmp_dir)
+        os.close(fd)
+        return SqliteTodo(path)
+
+    return FakeKeep(latency=latency)
+
+
+def make_canvas_todo(
+        canv: FakeCanvas, todo: TodoBase, user: FakeUser, max_in_flight: int
+) -> CanvasTodo:
+    """Builds CanvasTodo on fake backends, without reading configs or logging in
+
+    Parameters
+    ----------
+    canv : FakeCanvas
+        fake canvas
+    todo : TodoBase
+        todo backend
+    user : FakeUser
+        canvas user
+    max_in_flight : int
+        maximum number of courses fetched concurrently
+
+    Returns
+    -------
+    CanvasTodo
+        canvas todo object
+    """
+    canvas_todo = CanvasTodo.__new__(CanvasTodo)
+    canvas_todo.app_conf = {
+        "classes": canv.course_conf(),
+        "assignments_conf": ASSIGNMENTS_CONF,
+        "max_in_flight": max_in_flight,
+        "console_print": False,
+        "update_rate": 60
+    }
+    canvas_todo.canv = canv
+    canvas_todo.todo = todo
+    canvas_todo.user = user
+    canvas_todo.courses = canv.courses
+    canvas_todo.unavailable_courses = set()
+    canvas_todo.config = None
+    canvas_todo.cache = None
+    canvas_todo.course_cache = None
+    canvas_todo.shared_cache = None
+    canvas_todo.scheduler = Scheduler(60)
+    canvas_todo.metrics = NullMetrics()
+    return canvas_todo
+
+
+def bench_size(n_assignments: int, latency: float, max_in_flight: int, backend: str):
+    """Runs and reports a first (all new) and second (steady-state) cycle
+
+    Parameters
+    ----------
+    n_assignments : int
+        total number of assignments
+    latency : float
+        seconds each fake request takes
+    max_in_flight : int
+        maximum number of courses fetched concurrently
+    backend : str
+        todo backend (gkeep, sqlite)
+    """
+    # sqlite databases are created in a temporary directory, removed after the run
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        canv = FakeCanvas(N_COURSES, n_assignments, latency)
+        todo = make_todo(backend, latency, tmp_dir)
+        user = FakeUser(1)
+        classes = canv.course_conf()
+
+        for cycle in ("first", "steady"):
+            requests_before = canv.requester.request_count
+            canvas_tasks, fetch_time, fetch_mem = measure(
+                lambda: get_assignments(canv.courses, user, max_in_flight, **ASSIGNMENTS_CONF)
+            )
+            fetch_requests = canv.requester.request_count - requests_before
+
+            todo_dict = todo.request_todo_state(classes)
+            update_dict, diff_time, diff_mem = measure(
+                lambda: CanvasTodo.gen_update_todo_dict(todo_dict, canvas_tasks)
+            )
+
+            syncs_before = getattr(todo, "sync_count", 0)
+            _, post_time, post_mem = measure(lambda: todo.post_todo_state(update_dict, classes))
+            post_requests = getattr(todo, "sync_count", 0) - syncs_before
+
+            for phase, elapsed, n_requests, peak in (
+                    ("get_assignments", fetch_time, fetch_requests, fetch_mem),
+                    ("gen_update_todo_dict", diff_time, 0, diff_mem),
+                    ("post_todo_state", post_time, post_requests, post_mem)
+            ):
+                print(
+                    f"{n_assignments:>8} {cycle:<7} {phase:<22} "
+                    f"{1e3 * elapsed:>12.2f} {n_requests:>9} {peak:>10.2f}"
+                )
+
+        # whole streamed cycle, on fresh backends
+        canv = FakeCanvas(N_COURSES, n_assignments, latency)
+        todo = make_todo(backend, latency, tmp_dir)
+        canvas_todo = make_canvas_todo(canv, todo, user, max_in_flight)
+
+        for cycle in ("first", "steady"):
+            requests_before = canv.requester.request_count + getattr(todo, "sync_count", 0)
+            _, sync_time, sync_mem = measure(canvas_todo.sync)
+            sync_requests = (
+                canv.requester.request_count + getattr(todo, "sync_count", 0) - requests_before
+            )
+
+            print(
+                f"{n_assignments:>8} {cycle:<7} {'sync':<22} "
+                f"{1e3 * sync_time:>12.2f} {sync_requests:>9} {sync_mem:>10.2f}"
+            )
+
+
+def main():
+    """Parses arguments and runs benchmark at each size
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 50000])
+    parser.add_argument("--latency", type=float, default=0, help="seconds per fake request")
+    parser.add_argument("--max-in-flight", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip memory tracing")
+    parser.add_argument("--backend", choices=["gkeep", "sqlite"], default="gkeep")
+    args = parser.parse_args()
+
+    global TRACE_MEMORY
+    TRACE_MEMORY = not args.no_memory
+
+    print(
+        f"{'assmnts':>8} {'cycle':<7} {'phase':<22} "
+        f"{'latency(ms)':>12} {'requests':>9} {'peak(MB)':>10}"
+    )
+    for n_assignments in args.sizes:
+        bench_size(n_assignments, args.latency, args.max_in_flight, args.backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Micro-benchmark of CanvasTodo.gen_update_todo_dict
+
+Run from the repository root with `python -m benchmarks.bench_diff`. Diff time per task should stay
+roughly constant as the number of tasks grows
+"""
+import random
+import timeit
+from datetime import timedelta
+from collections import namedtuple
+
+from canvas_todo.canvas_todo import CanvasTodo
+from canvas_todo.todo import Task, Completed
+from canvas_todo.utils import time_utils
+
+
+TASK_COUNTS = (10, 100, 1000, 10000)
+
+# hashable stand-in for canvas course
+FakeCourse = namedtuple("FakeCourse", ["id", "name"])
+
+
+def gen_states(n_tasks: int):
+    """Generates todo and canvas states with a mix of every update kind
+
+    Parameters
+    ----------
+    n_tasks : int
+        number of tasks in course
+
+    Returns
+    -------
+    Tuple[Dict[int, List[Task]], Dict[Any, List[Task]]]
+        todo dict and canvas tasks dict
+    """
+    rand = random.Random(n_tasks)
+    start = time_utils.from_iso8601("2021-01-01T00:00:00Z")
+    course = FakeCourse(1, "Course")
+
+    canv_tasks = [
+        Task(
+            f"Assignment {i}",
+            start + timedelta(hours=i),
+            rand.choice([Completed.COMPLETE, Completed.INCOMPLETE, Completed.UNKNOWN])
+        )
+        for i in range(n_tasks)
+    ]
+
+    todo_tasks = []
+    for task in canv_tasks:
+        roll = rand.random()
+
+        # unchanged, stale completed-ness, changed due date, renamed, or missing from todo
+        if roll < 0.6:
+            todo_tasks.append(Task(task.name, task.due_date, task.completed))
+        elif roll < 0.7:
+            todo_tasks.append(Task(task.name, task.due_date, Completed.INCOMPLETE))
+        elif roll < 0.8:
+            todo_tasks.append(Task(task.name, task.due_date - timedelta(days=1), task.completed))
+        elif roll < 0.9:
+            todo_tasks.append(Task(task.name + " (old)", task.due_date, task.completed))
+
+    # tasks removed from canvas
+    todo_tasks += [
+        Task(f"Removed {i}", start - timedelta(hours=i), Completed.INCOMPLETE)
+        for i in range(n_tasks // 10)
+    ]
+
+    return {course.id: todo_tasks}, {course: canv_tasks}
+
+
+def main():
+    """Times diff at each task count and prints time per task
+    """
+    print(f"{'tasks':>8} {'total (ms)':>12} {'per task (us)':>14}")
+    for n_tasks in TASK_COUNTS:
+        todo_dict, canvas_tasks = gen_states(n_tasks)
+
+        number = max(1, 10000 // n_tasks)
+        total = min(timeit.repeat(
+            lambda: CanvasTodo.gen_update_todo_dict(todo_dict, canvas_tasks),
+            number=number,
+            repeat=5
+        )) / number
+
+        print(f"{n_tasks:>8} {1e3 * total:>12.3f} {1e6 * total / n_tasks:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
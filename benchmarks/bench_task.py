@@ -0,0 +1,70 @@
+"""Benchmark of Task memory and diff-key cost against the original plain dataclass
+
+Run from the repository root with `python -m benchmarks.bench_task`
+"""
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from canvas_todo.todo import Task, Completed
+from canvas_todo.utils import time_utils
+
+
+N_TASKS = 5000
+
+
+@dataclass
+class OldTask:
+    """Original plain Task dataclass, recomputing todo string and sort key on use
+    """
+    name: str
+    due_date: datetime
+    completed: Completed
+
+    def todo_str(self) -> str:
+        return f"{self.name} ({time_utils.to_due_date_str(self.due_date)})"
+
+
+def build(cls, due_dates):
+    """Builds tasks of class for each due date
+    """
+    return [cls(f"Assignment {i}", due, Completed.INCOMPLETE) for i, due in enumerate(due_dates)]
+
+
+def peak_bytes(cls, due_dates) -> int:
+    """Returns peak bytes allocated holding tasks and their todo strings
+    """
+    tracemalloc.start()
+    tasks = build(cls, due_dates)
+    todo_strs = [task.todo_str() for task in tasks]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    del tasks, todo_strs
+    return peak
+
+
+def main():
+    """Prints memory per task and time of repeated diff lookups for old and new tasks
+    """
+    start = time_utils.from_iso8601("2021-01-01T00:00:00Z")
+    due_dates = [start + timedelta(hours=i) for i in range(N_TASKS)]
+
+    print(f"{'task':<8} {'bytes/task':>12} {'lookups (ms)':>14}")
+    for name, cls in (("old", OldTask), ("new", Task)):
+        tasks = build(cls, due_dates)
+
+        # sort and todo string lookups, as done by a sync cycle
+        lookup = lambda: (
+            sorted(tasks, key=lambda t: t.due_date or time_utils.max_time())
+            if cls is OldTask else sorted(tasks, key=lambda t: t.sort_key),
+            [task.todo_str() for task in tasks]
+        )
+        total = min(timeit.repeat(lookup, number=5, repeat=3)) / 5
+
+        print(f"{name:<8} {peak_bytes(cls, due_dates) / N_TASKS:>12.0f} {1e3 * total:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
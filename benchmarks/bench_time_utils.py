@@ -0,0 +1,73 @@
+"""Benchmark of time_utils date parsing against the original strptime implementations
+
+Run from the repository root with `python -m benchmarks.bench_time_utils`
+"""
+import timeit
+from datetime import datetime, timedelta
+
+from dateutil import tz
+
+from canvas_todo.utils import time_utils
+
+
+N_STRINGS = 1000
+REPEATS = 20
+
+
+def old_from_iso8601(date_str: str) -> datetime:
+    """Original strptime implementation of time_utils.from_iso8601
+    """
+    try:
+        return datetime.strptime(
+            date_str, time_utils.ISO8601_DATE_FORMAT
+        ).replace(tzinfo=tz.tzutc()).astimezone(tz.tzlocal()).replace(second=0)
+    except TypeError:
+        return None
+
+
+def old_from_due_date_str(date_str: str) -> datetime:
+    """Original strptime implementation of time_utils.from_due_date_str
+    """
+    try:
+        return datetime.strptime(
+            date_str, time_utils.DUE_DATE_FORMAT
+        ).astimezone(tz.tzlocal()).replace(second=0)
+    except ValueError as e:
+        if date_str == "no due date":
+            return None
+        else:
+            raise e
+
+
+def bench(func, strs):
+    """Returns parses per second of func over strs, repeated as in a sync cycle
+    """
+    total = min(timeit.repeat(lambda: [func(s) for s in strs], number=REPEATS, repeat=3))
+    return REPEATS * len(strs) / total
+
+
+def main():
+    """Prints throughput of old and new parsers, cold (cache cleared) and warm
+    """
+    start = datetime(2021, 1, 1)
+    iso_strs = [
+        (start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ") for i in range(N_STRINGS)
+    ]
+    due_strs = [time_utils.to_due_date_str(time_utils.from_iso8601(s)) for s in iso_strs]
+
+    # check parsers agree
+    assert all(old_from_iso8601(s) == time_utils.from_iso8601(s) for s in iso_strs)
+    assert all(old_from_due_date_str(s) == time_utils.from_due_date_str(s) for s in due_strs)
+
+    print(f"{'parser':<20} {'old (/s)':>12} {'new cold (/s)':>14} {'new warm (/s)':>14}")
+    for name, old_func, new_func, strs in (
+            ("from_iso8601", old_from_iso8601, time_utils.from_iso8601, iso_strs),
+            ("from_due_date_str", old_from_due_date_str, time_utils.from_due_date_str, due_strs)
+    ):
+        cold = bench(new_func.__wrapped__, strs)
+        warm = bench(new_func, strs)
+        print(f"{name:<20} {bench(old_func, strs):>12.0f} {cold:>14.0f} {warm:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""In-process stand-ins for Canvas and Google Keep, used by the benchmarks
+
+FakeCanvas mimics the parts of canvasapi used by canvas_todo, serving generated courses,
+assignments and submissions in pages with injected latency. FakeKeep is a GKeep backed by gkeepapi's
+in-memory note model, without logging in or syncing with Google
+"""
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from time import sleep
+from typing import Dict, Iterator, List, Optional
+
+import gkeepapi
+
+from canvas_todo.todo import GKeep
+
+
+class FakeRequester:
+    """Counts requests and injects latency per request
+    """
+    latency: float
+    request_count: int
+
+    def __init__(self, latency: float = 0):
+        """Initializes requester
+
+        Parameters
+        ----------
+        latency : float
+            seconds each request takes
+        """
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    def request(self):
+        """Simulates one request
+        """
+        with self._lock:
+            self.request_count += 1
+
+        if self.latency > 0:
+            sleep(self.latency)
+
+
+class FakePaginatedList:
+    """Paginated list, requesting each page of items as it is iterated
+    """
+    def __init__(self, requester: FakeRequester, items: List, per_page: int = 10):
+        """Initializes paginated list
+
+        Parameters
+        ----------
+        requester : FakeRequester
+            requester to send page requests through
+        items : List
+            items to serve
+        per_page : int
+            items per page [default: 10, as canvas]
+        """
+        self._requester = requester
+        self._items = items
+        self._per_page = per_page
+
+    def __iter__(self) -> Iterator:
+        """Iterates items, requesting a page at a time
+        """
+        for start in range(0, max(len(self._items), 1), self._per_page):
+            self._requester.request()
+            yield from self._items[start:start + self._per_page]
+
+
+class FakeAssignment:
+    """Canvas assignment stand-in
+    """
+    def __init__(
+            self, id: int, course_id: int, name: str, due_at: Optional[str], submission_types: List[str]
+    ):
+        self.id = id
+        self.course_id = course_id
+        self.name = name
+        self.due_at = due_at
+        self.updated_at = "2021-01-01T00:00:00Z"
+        self.submission_types = submission_types
+
+
+class FakeSubmission:
+    """Canvas submission stand-in
+    """
+    def __init__(
+            self, assignment_id: int, submitted_at: Optional[str], cached_due_date: Optional[str]
+    ):
+        self.assignment_id = assignment_id
+        self.submitted_at = submitted_at
+        self.cached_due_date = cached_due_date
+
+
+class FakeUser:
+    """Canvas user stand-in
+    """
+    def __init__(self, id: int):
+        self.id = id
+
+
+class FakeCourse:
+    """Canvas course stand-in
+    """
+    def __init__(
+            self,
+            requester: FakeRequester,
+            id: int,
+            name: str,
+            assignments: List[FakeAssignment],
+            submissions: List[FakeSubmission]
+    ):
+        self._requester = requester
+        self.id = id
+        self.name = name
+        self.assignments = assignments
+        self.submissions = submissions
+
+    def get_assignments(
+            self,
+            per_page: int = 10,
+            order_by: Optional[str] = None,
+            bucket: Optional[str] = None,
+            **kwargs
+    ) -> FakePaginatedList:
+        """Returns paginated list of assignments, supporting due date order and the undated, future
+        and past buckets
+        """
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        assignments = self.assignments
+        if bucket == "undated":
+            assignments = [a for a in assignments if a.due_at is None]
+        elif bucket == "future":
+            assignments = [a for a in assignments if a.due_at is None or a.due_at >= now]
+        elif bucket == "past":
+            assignments = [a for a in assignments if not a.due_at is None and a.due_at < now]
+
+        # undated assignments go last, as in canvas
+        if order_by == "due_at":
+            assignments = sorted(assignments, key=lambda a: (a.due_at is None, a.due_at or ""))
+
+        return FakePaginatedList(self._requester, assignments, per_page)
+
+    def get_multiple_submissions(self, per_page: int = 10, **kwargs) -> FakePaginatedList:
+        """Returns paginated list of submissions of user
+        """
+        return FakePaginatedList(self._requester, self.submissions, per_page)
+
+    def get_submission(self, assmnt_id: int, user: FakeUser) -> FakeSubmission:
+        """Returns submission of single assignment
+        """
+        self._requester.request()
+        return next(s for s in self.submissions if s.assignment_id == assmnt_id)
+
+
+class FakeCanvas:
+    """Canvas stand-in serving generated courses and assignments
+    """
+    requester: FakeRequester
+    courses: List[FakeCourse]
+
+    def __init__(
+            self,
+            n_courses: int = 5,
+            n_assignments: int = 100,
+            latency: float = 0,
+            seed: int = 0
+    ):
+        """Generates courses with assignments due over a term, half past and half upcoming
+
+        Parameters
+        ----------
+        n_courses : int
+            number of courses
+        n_assignments : int
+            total number of assignments, split evenly over courses
+        latency : float
+            seconds each request takes
+        seed : int
+            random seed
+        """
+        rand = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        self.requester = FakeRequester(latency)
+        self.courses = []
+
+        for course_idx in range(n_courses):
+            course_id = 1000 + course_idx
+            assignments, submissions = [], []
+
+            for i in range(course_idx, n_assignments, n_courses):
+                due_at = (
+                    None if rand.random() < 0.05 else
+                    (now + timedelta(minutes=rand.randrange(-60 * 24 * 60, 60 * 24 * 60)))
+                    .strftime("%Y-%m-%dT%H:%M:%SZ")
+                )
+                submission_types = ["none"] if rand.random() < 0.1 else ["online_upload"]
+                assignments.append(
+                    FakeAssignment(i, course_id, f"Assignment {i}", due_at, submission_types)
+                )
+
+                submitted_at = "2021-01-01T00:00:00Z" if rand.random() < 0.5 else None
+                submissions.append(FakeSubmission(i, submitted_at, due_at))
+
+            self.courses.append(
+                FakeCourse(self.requester, course_id, f"Course {course_idx}", assignments, submissions)
+            )
+
+    def get_current_user(self) -> FakeUser:
+        """Returns current user
+        """
+        self.requester.request()
+        return FakeUser(1)
+
+    def get_courses(self, **kwargs) -> FakePaginatedList:
+        """Returns paginated list of courses
+        """
+        return FakePaginatedList(self.requester, self.courses)
+
+    def get_course(self, course_id: int, **kwargs) -> FakeCourse:
+        """Returns course by ID
+        """
+        self.requester.request()
+        return next(course for course in self.courses if course.id == course_id)
+
+    def course_conf(self) -> Dict[int, Dict]:
+        """Returns classes config of app config for generated courses
+        """
+        colors = list(gkeepapi.node.ColorValue)
+        return {
+            course.id: {"nickname": course.name, "color": colors[idx % len(colors)]}
+            for idx, course in enumerate(self.courses)
+        }
+
+
+class FakeKeep(GKeep):
+    """Google Keep interface backed by gkeepapi's in-memory model, without login or network
+    """
+    sync_count: int
+
+    def __init__(self, gkeep_conf: Optional[Dict] = None, latency: float = 0):
+        """Initializes fake google keep object
+
+        Parameters
+        ----------
+        gkeep_conf : Optional[Dict]
+            google keep configuration [default: unpinned notes]
+        latency : float
+            seconds each sync takes
+        """
+        self.conf = {"pin_notes": False} if gkeep_conf is None else gkeep_conf
+        self.state_path = None
+        self.keep = gkeepapi.Keep()
+        self.sync_count = 0
+        self.latency = latency
+
+        # replace network sync with counted no-op
+        self.keep.sync = self._sync
+
+        self._invalidate_index()
+        self._skipped_syncs = 0
+        self.notes_written = 0
+        self.items_written = 0
+
+    def _sync(self, *args, **kwargs):
+        """Simulates one sync with google keep
+        """
+        self.sync_count += 1
+
+        if self.latency > 0:
+            sleep(self.latency)
@@ -1 +1,20 @@
-from . import config, canvas_todo
+import importlib
+
+
+# submodules are imported on first access, so that importing the package (e.g. for config paths)
+# doesn't load canvasapi, gkeepapi and the rest of the sync dependencies
+__all__ = ["config", "canvas_todo", "daemon"]
+
+
+def __getattr__(name: str):
+    """Imports submodule of package on first access
+
+    Parameters
+    ----------
+    name : str
+        submodule name
+    """
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,8 @@
-from typing import Dict, List
+import asyncio
+import copy
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 
 from canvasapi.course import Course
 from canvasapi.assignment import Assignment
@@ -7,42 +10,410 @@ from canvasapi.user import User
 
 from .utils import time_utils
 from .todo.task import Task
+from .cache import AssignmentCache, SharedCourseCache
+
+
+# maximum page size canvas serves for list endpoints
+PER_PAGE = 100
 
 
 def get_assignments(
         courses: List[Course],
         user: User,
+        max_in_flight: int = 1,
+        cache: Optional[AssignmentCache] = None,
         **kwargs: Dict
 ) -> Dict[Course, List[Task]]:
     """Returns dictionary of tasks for each course, sorted by due date
 
+    Courses are fetched on a thread pool rather than an event loop, so this can be called from any
+    thread, including one running an event loop
+
     Parameters
     ----------
     courses : List[Course]
         list of course objects
     user : User
         user to use to get completed-ness
+    max_in_flight : int
+        maximum number of courses fetched concurrently (requests of each course are serial),
+        fetches serially if 1
+    cache : Optional[AssignmentCache]
+        persistent assignment cache, used to skip unchanged work if supplied
     **kwargs : Dict
-        keywords dict to pass to filter function
+        keyword arguments of iter_course_tasks (shared cache and filter arguments)
+
+    Returns
+    -------
+    Dict[Course, List[Task]]
+        dict of tasks for each course
+    """
+    def fetch_course_tasks(course: Course) -> List[Task]:
+        return get_course_tasks(course, user, cache, **kwargs)
+
+    # fetch serially
+    if max_in_flight <= 1:
+        return {course: fetch_course_tasks(course) for course in courses}
+
+    # fetch courses in parallel, keeping course order
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        return dict(zip(courses, executor.map(fetch_course_tasks, courses)))
+
+
+async def get_assignments_async(
+        courses: List[Course],
+        user: User,
+        max_in_flight: int = 1,
+        cache: Optional[AssignmentCache] = None,
+        **kwargs: Dict
+) -> Dict[Course, List[Task]]:
+    """Returns dictionary of tasks for each course, sorted by due date, fetching courses concurrently
+
+    Parameters
+    ----------
+    courses : List[Course]
+        list of course objects
+    user : User
+        user to use to get completed-ness
+    max_in_flight : int
+        maximum number of courses fetched concurrently (requests of each course are serial),
+        fetches serially if 1
+    cache : Optional[AssignmentCache]
+        persistent assignment cache, used to skip unchanged work if supplied
+    **kwargs : Dict
+        keyword arguments of iter_course_tasks (shared cache and filter arguments)
 
     Returns
     -------
     Dict[Course, List[Task]]
         dict of tasks for each course
     """
-    return {
-        course: sorted(
-            [
-                Task.from_canvas_assmnt(a, user)
-                for a in course.get_assignments()
-                if should_include(a, **kwargs)
-            ], key=lambda x: x.due_date if not x.due_date is None else time_utils.max_time()
+    # collect courses as they finish, then restore course order
+    course_tasks = {
+        course: tasks
+        async for course, tasks in iter_assignments_async(
+            courses, user, max_in_flight, cache, **kwargs
+        )
+    }
+
+    return {course: course_tasks[course] for course in courses}
+
+
+async def iter_assignments_async(
+        courses: List[Course],
+        user: User,
+        max_in_flight: int = 1,
+        cache: Optional[AssignmentCache] = None,
+        *,
+        sort: bool = True,
+        **kwargs: Dict
+) -> AsyncIterator[Tuple[Course, List[Task]]]:
+    """Yields tasks of each course as soon as the course is fetched
+
+    Courses are fetched concurrently and yielded in the order they finish. canvasapi is blocking,
+    so each course is streamed in a worker thread, awaited from the event loop
+
+    Parameters
+    ----------
+    courses : List[Course]
+        list of course objects
+    user : User
+        user to use to get completed-ness
+    max_in_flight : int
+        maximum number of courses fetched concurrently (requests of each course are serial),
+        fetches serially if 1
+    cache : Optional[AssignmentCache]
+        persistent assignment cache, used to skip unchanged work if supplied
+    sort : bool
+        sort tasks of each course by due date, otherwise tasks are in canvas order
+    **kwargs : Dict
+        keyword arguments of iter_course_tasks (shared cache and filter arguments)
+
+    Yields
+    ------
+    Tuple[Course, List[Task]]
+        course and its tasks
+    """
+    # bound number of courses fetched concurrently
+    semaphore = asyncio.Semaphore(max(max_in_flight, 1))
+
+    async def fetch_course_tasks(course: Course) -> Tuple[Course, List[Task]]:
+        async with semaphore:
+            return course, await asyncio.to_thread(
+                get_course_tasks if sort else list_course_tasks,
+                course,
+                user,
+                cache,
+                **kwargs
+            )
+
+    # fetch every course in parallel, yielding each as it finishes
+    tasks = [asyncio.ensure_future(fetch_course_tasks(course)) for course in courses]
+    try:
+        for next_course in asyncio.as_completed(tasks):
+            yield await next_course
+
+    # if a fetch fails or the consumer stops early, cancel remaining fetches and retrieve results
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_course_tasks(
+        course: Course,
+        user: User,
+        cache: Optional[AssignmentCache] = None,
+        **kwargs: Dict
+) -> List[Task]:
+    """Returns list of tasks for course, sorted by due date
+
+    Parameters
+    ----------
+    course : Course
+        course object
+    user : User
+        user to use to get completed-ness
+    cache : Optional[AssignmentCache]
+        persistent assignment cache, used to skip unchanged work if supplied
+    **kwargs : Dict
+        keyword arguments of iter_course_tasks (shared cache and filter arguments)
+
+    Returns
+    -------
+    List[Task]
+        list of tasks for course
+    """
+    return sorted(
+        iter_course_tasks(course, user, cache, **kwargs),
+        key=lambda x: x.sort_key
+    )
+
+
+def list_course_tasks(
+        course: Course,
+        user: User,
+        cache: Optional[AssignmentCache] = None,
+        **kwargs: Dict
+) -> List[Task]:
+    """Returns list of tasks for course, in canvas order
+
+    Parameters
+    ----------
+    course : Course
+        course object
+    user : User
+        user to use to get completed-ness
+    cache : Optional[AssignmentCache]
+        persistent assignment cache, used to skip unchanged work if supplied
+    **kwargs : Dict
+        keyword arguments of iter_course_tasks (shared cache and filter arguments)
+
+    Returns
+    -------
+    List[Task]
+        list of tasks for course
+    """
+    return list(iter_course_tasks(course, user, cache, **kwargs))
+
+
+def iter_course_tasks(
+        course: Course,
+        user: User,
+        cache: Optional[AssignmentCache] = None,
+        *,
+        shared_cache: Optional[SharedCourseCache] = None,
+        **kwargs: Dict
+) -> Iterator[Task]:
+    """Yields tasks of course as pages of assignments arrive, in canvas order
+
+    Assignments are filtered before tasks are built, and only one page of assignments is held at a
+    time, so memory doesn't grow with the number of assignments in the course. Submissions are
+    requested once the first assignment passes the filter, and not at all if none does
+
+    Parameters
+    ----------
+    course : Course
+        course object
+    user : User
+        user to use to get completed-ness
+    cache : Optional[AssignmentCache]
+        persistent assignment cache, used to only request new submissions if supplied
+    shared_cache : Optional[SharedCourseCache]
+        cache of course assignments shared with other accounts on the same canvas host, fetched
+        per account if None
+    **kwargs : Dict
+        keywords dict to pass to filter function
+
+    Yields
+    ------
+    Task
+        task of included assignment
+    """
+    # assignments of other accounts are only shared without their overrides applied
+    if not shared_cache is None:
+        yield from iter_shared_course_tasks(course, user, shared_cache, cache, **kwargs)
+        return
+
+    submitted_ids = None
+    for assmnt in iter_course_assignments(course, **kwargs):
+        # get submitted assignments for whole course at once, on first included assignment
+        if submitted_ids is None:
+            submitted_ids = get_submitted_ids(course, user, cache)
+
+        yield Task.from_canvas_assmnt(assmnt, user, submitted_ids)
+
+
+def iter_shared_course_tasks(
+        course: Course,
+        user: User,
+        shared_cache: SharedCourseCache,
+        cache: Optional[AssignmentCache] = None,
+        due_date_horizon: int = 0
+) -> Iterator[Task]:
+    """Yields tasks of course from assignments shared with other accounts, in canvas order
+
+    Shared assignments are fetched without any student's overrides, so they're the same for every
+    account. Each account then lists its own submissions, which exist only for assignments assigned
+    to it, and carry its effective due date (with overrides applied). Assignments are then filtered
+    by should_include with these due dates
+
+    Parameters
+    ----------
+    course : Course
+        course object
+    user : User
+        user to use to get completed-ness and due dates
+    shared_cache : SharedCourseCache
+        cache of course assignments shared with other accounts on the same canvas host
+    cache : Optional[AssignmentCache]
+        persistent assignment cache, used to only request new submissions if supplied
+    due_date_horizon : int
+        maximum number of days from current date to due date
+
+    Yields
+    ------
+    Task
+        task of included assignment
+    """
+    assmnts = shared_cache.get_or_fetch(
+        ("assignments", course.id),
+        lambda: list(course.get_assignments(override_assignment_dates=False, per_page=PER_PAGE))
+    )
+
+    # get every submission of user, as overrides and membership are needed for every assignment
+    sync_start = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    submissions = {
+        submission.assignment_id: submission
+        for submission in course.get_multiple_submissions(student_ids=[user.id], per_page=PER_PAGE)
+    }
+    submitted_ids = {
+        assmnt_id
+        for assmnt_id, submission in submissions.items()
+        if not getattr(submission, "submitted_at", None) is None
+    }
+    if not cache is None:
+        cache.put_submitted(course.id, submitted_ids, sync_start, True)
+
+    # get current time once for all assignments
+    now = datetime.now(timezone.utc)
+
+    for assmnt in assmnts:
+        # skip assignments not assigned to user
+        submission = submissions.get(assmnt.id)
+        if submission is None:
+            continue
+
+        # apply user's due date to a copy, leaving shared assignment untouched
+        assmnt = copy.copy(assmnt)
+        assmnt.due_at = getattr(submission, "cached_due_date", assmnt.due_at)
+
+        if not should_include(assmnt, due_date_horizon, now=now):
+            continue
+
+        yield Task.from_canvas_assmnt(assmnt, user, submitted_ids)
+
+
+def iter_course_assignments(course: Course, due_date_horizon: int) -> Iterator[Assignment]:
+    """Yields assignments of course within due date horizon, filtering on canvas where possible
+
+    Canvas buckets assignments by the user's own due dates (with overrides applied), so assignments
+    not yet due (including undated ones) are checked against the horizon with the user's due dates,
+    and past due assignments are all included, as with should_include
+
+    Parameters
+    ----------
+    course : Course
+        course object
+    due_date_horizon : int
+        maximum number of days from current date to due date
+
+    Yields
+    ------
+    Assignment
+        assignment within due date horizon
+    """
+    # get current time once for all assignments
+    now = datetime.now(timezone.utc)
+
+    # assignments not yet due and undated assignments, within horizon (canvas orders by base due
+    # date, not the user's, so the whole bucket is checked rather than stopping at the horizon)
+    for assmnt in course.get_assignments(bucket="future", per_page=PER_PAGE):
+        if should_include(assmnt, due_date_horizon, now=now):
+            yield assmnt
+
+    # past due assignments, always within horizon
+    yield from course.get_assignments(bucket="past", per_page=PER_PAGE)
+
+
+def get_submitted_ids(
+        course: Course, user: User, cache: Optional[AssignmentCache] = None
+) -> Set[int]:
+    """Returns IDs of assignments in course that user has submitted
+
+    Fetches every submission for the user in one paginated listing, rather than one request per
+    assignment. If a cache is supplied, only submissions made since the last sync are requested
+
+    Parameters
+    ----------
+    course : Course
+        course to get submissions for
+    user : User
+        user to get submissions for
+    cache : Optional[AssignmentCache]
+        persistent assignment cache
+
+    Returns
+    -------
+    Set[int]
+        set of assignment IDs with a submission
+    """
+    # get time of last sync (None if full sync needed)
+    synced_at = None if cache is None else cache.get_synced_at(course.id)
+    sync_start = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    # only request submissions since last sync
+    kwargs = {} if synced_at is None else {"submitted_since": synced_at}
+
+    submitted_ids = {
+        submission.assignment_id
+        for submission in course.get_multiple_submissions(
+            student_ids=[user.id], per_page=PER_PAGE, **kwargs
         )
-        for course in courses
+        if not getattr(submission, "submitted_at", None) is None
     }
 
+    if cache is None:
+        return submitted_ids
+
+    # merge new submissions into cached submissions
+    cache.put_submitted(course.id, submitted_ids, sync_start, synced_at is None)
+    return cache.get_submitted(course.id)
 
-def should_include(assmnt: Assignment, due_date_horizon: int) -> bool:
+
+def should_include(
+        assmnt: Assignment, due_date_horizon: int, now: Optional[datetime] = None
+) -> bool:
     """Returns true if assignment meets supplied criteria
 
     Parameters
@@ -52,6 +423,8 @@ def should_include(assmnt: Assignment, due_date_horizon: int) -> bool:
     due_date_horizon : int
         maximum number of days from current date to due date
         note: automatically included in due date horizon if no due date
+    now : Optional[datetime]
+        current time, pass to reuse across assignments [default: time of call]
 
     Returns
     -------
@@ -62,7 +435,8 @@ def should_include(assmnt: Assignment, due_date_horizon: int) -> bool:
         (
             assmnt.due_at is None or
             (
-                time_utils.from_iso8601(assmnt.due_at) - datetime.now(timezone.utc)
+                time_utils.from_iso8601(assmnt.due_at) - (now or datetime.now(timezone.utc))
             ).days < due_date_horizon
         )
     )
+
@@ -0,0 +1,3 @@
+from .assignment_cache import AssignmentCache
+from .course_cache import CourseCache
+from .shared_cache import SharedCourseCache
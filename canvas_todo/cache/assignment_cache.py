@@ -0,0 +1,177 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Set
+
+
+class AssignmentCache:
+    """Persistent cache of submitted assignments, keyed by course
+
+    Stores the set of submitted assignments per course with the time it was last synced, so later
+    cycles only request submissions made since. Assignments themselves are always requested, as
+    building tasks from them is cheaper than looking them up
+    """
+    conn: sqlite3.Connection
+    max_age: Optional[float]
+    hits: int
+    misses: int
+
+    def __init__(self, path: str, max_age: Optional[float] = None):
+        """Initializes assignment cache
+
+        Parameters
+        ----------
+        path : str
+            path to sqlite database file
+        max_age : Optional[float]
+            seconds after which submissions of a course are fully resynced, never if None
+        """
+        self.max_age = max_age
+
+        # incremental (hit) and full (miss) submission syncs, for hit rate metrics
+        self.hits = 0
+        self.misses = 0
+
+        # connection is shared between fetch threads, so guard with lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+
+        # create tables if they don't exist (dropping task table of older versions)
+        with self._lock, self.conn:
+            self.conn.executescript(
+                """
+                DROP TABLE IF EXISTS assignments;
+                CREATE TABLE IF NOT EXISTS submissions (
+                    course_id INTEGER,
+                    assignment_id INTEGER,
+                    PRIMARY KEY (course_id, assignment_id)
+                );
+                CREATE TABLE IF NOT EXISTS syncs (
+                    course_id INTEGER PRIMARY KEY,
+                    synced_at TEXT,
+                    cached_at REAL
+                );
+                """
+            )
+
+    def get_synced_at(self, course_id: int) -> Optional[str]:
+        """Returns time submissions of course were last synced
+
+        Parameters
+        ----------
+        course_id : int
+            course ID
+
+        Returns
+        -------
+        Optional[str]
+            ISO8601 time of last sync, or None if never synced or expired
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT synced_at, cached_at FROM syncs WHERE course_id = ?", (course_id,)
+            ).fetchone()
+
+            if row is None or self._expired(row[1]):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        return row[0]
+
+    def get_submitted(self, course_id: int) -> Set[int]:
+        """Returns cached IDs of submitted assignments in course
+
+        Parameters
+        ----------
+        course_id : int
+            course ID
+
+        Returns
+        -------
+        Set[int]
+            set of submitted assignment IDs
+        """
+        with self._lock:
+            return {
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT assignment_id FROM submissions WHERE course_id = ?", (course_id,)
+                )
+            }
+
+    def put_submitted(
+            self, course_id: int, assmnt_ids: Iterable[int], synced_at: str, full: bool
+    ):
+        """Caches submitted assignments of course
+
+        Parameters
+        ----------
+        course_id : int
+            course ID
+        assmnt_ids : Iterable[int]
+            IDs of submitted assignments
+        synced_at : str
+            ISO8601 time the submissions were requested at
+        full : bool
+            true if IDs are every submission in course, replacing cached ones
+        """
+        with self._lock, self.conn:
+            if full:
+                self.conn.execute("DELETE FROM submissions WHERE course_id = ?", (course_id,))
+
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO submissions VALUES (?, ?)",
+                [(course_id, assmnt_id) for assmnt_id in assmnt_ids]
+            )
+
+            # only restart max age on a full sync
+            if full:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)",
+                    (course_id, synced_at, datetime.now(timezone.utc).timestamp())
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE syncs SET synced_at = ? WHERE course_id = ?", (synced_at, course_id)
+                )
+
+    def prune(self):
+        """Removes submissions of courses whose last full sync is expired
+        """
+        if self.max_age is None:
+            return
+
+        cutoff = datetime.now(timezone.utc).timestamp() - self.max_age
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM syncs WHERE cached_at < ?", (cutoff,))
+            self.conn.execute(
+                "DELETE FROM submissions WHERE NOT course_id IN (SELECT course_id FROM syncs)"
+            )
+
+    def clear(self):
+        """Invalidates all cached entries
+        """
+        with self._lock, self.conn:
+            self.conn.executescript(
+                "DELETE FROM submissions; DELETE FROM syncs;"
+            )
+
+    def _expired(self, cached_at: float) -> bool:
+        """Returns true if entry cached at given time is past max age
+
+        Parameters
+        ----------
+        cached_at : float
+            POSIX timestamp entry was cached at
+
+        Returns
+        -------
+        bool
+            true if entry is expired
+        """
+        return (
+            self.max_age is not None and
+            datetime.now(timezone.utc).timestamp() - cached_at > self.max_age
+        )
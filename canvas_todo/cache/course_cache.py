@@ -0,0 +1,111 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+
+class CourseCache:
+    """Persistent course metadata cache, keyed by course ID
+
+    Stores the attributes canvas returned for each course, so startup can rebuild course objects
+    without requesting them again until they expire
+    """
+    conn: sqlite3.Connection
+    max_age: Optional[float]
+
+    def __init__(self, path: str, max_age: Optional[float] = None):
+        """Initializes course cache
+
+        Parameters
+        ----------
+        path : str
+            path to sqlite database file
+        max_age : Optional[float]
+            seconds after which cached courses are refetched, never if None
+        """
+        self.max_age = max_age
+
+        # connection may be shared between fetch threads, so guard with lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+
+        # create table if it doesn't exist
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS courses (
+                    course_id INTEGER PRIMARY KEY,
+                    attributes TEXT,
+                    cached_at REAL
+                )
+                """
+            )
+
+    def get_courses(self, course_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Returns cached attributes of courses that haven't expired
+
+        Parameters
+        ----------
+        course_ids : Iterable[int]
+            course IDs
+
+        Returns
+        -------
+        Dict[int, Dict]
+            course attributes, keyed by course ID (missing if not cached or expired)
+        """
+        course_ids = list(course_ids)
+
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT course_id, attributes, cached_at FROM courses "
+                f"WHERE course_id IN ({', '.join('?' * len(course_ids))})",
+                course_ids
+            ).fetchall()
+
+        return {
+            course_id: json.loads(attributes)
+            for course_id, attributes, cached_at in rows
+            if not self._expired(cached_at)
+        }
+
+    def put_course(self, course_id: int, attributes: Dict):
+        """Caches attributes of course
+
+        Parameters
+        ----------
+        course_id : int
+            course ID
+        attributes : Dict
+            course attributes, as returned by canvas
+        """
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO courses VALUES (?, ?, ?)",
+                (course_id, json.dumps(attributes), datetime.now(timezone.utc).timestamp())
+            )
+
+    def clear(self):
+        """Invalidates all cached courses
+        """
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM courses")
+
+    def _expired(self, cached_at: float) -> bool:
+        """Returns true if course cached at given time is past max age
+
+        Parameters
+        ----------
+        cached_at : float
+            POSIX timestamp course was cached at
+
+        Returns
+        -------
+        bool
+            true if course is expired
+        """
+        return (
+            self.max_age is not None and
+            datetime.now(timezone.utc).timestamp() - cached_at > self.max_age
+        )
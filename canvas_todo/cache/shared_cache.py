@@ -0,0 +1,135 @@
+import threading
+import collections
+from time import monotonic
+from typing import Any, Callable, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class SharedCourseCache:
+    """In-process cache of course-level canvas data, shared by every account of a process
+
+    Assignments and course metadata are the same for every student of a course, so accounts
+    sharing a course fetch them once per max age instead of once each. Entries are evicted least
+    recently used past max_entries. Concurrent lookups of a missing entry wait for a single fetch,
+    so accounts syncing at the same time don't all fetch it
+    """
+    max_age: float
+    max_entries: Optional[int]
+    hits: int
+    misses: int
+
+    def __init__(self, max_age: float = 300, max_entries: Optional[int] = 1000):
+        """Initializes shared course cache
+
+        Parameters
+        ----------
+        max_age : float
+            seconds after which entries are refetched
+        max_entries : Optional[int]
+            maximum number of cached entries, unbounded if None
+        """
+        self.max_age = max_age
+        self.max_entries = max_entries
+
+        # lookup counts, for hit rate metrics
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = collections.OrderedDict()
+        self._fetch_locks = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Returns cached value of key, fetching and caching it if missing or expired
+
+        Parameters
+        ----------
+        key : Hashable
+            cache key (caches should only be shared by accounts of one canvas host)
+        fetch : Callable[[], Any]
+            function fetching value, None results aren't cached
+
+        Returns
+        -------
+        Any
+            cached or fetched value
+        """
+        with self._lock:
+            if not (value := self._get(key)) is _MISSING:
+                self.hits += 1
+                return value
+
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        # fetch once, other lookups of key wait for it
+        with fetch_lock:
+            with self._lock:
+                if not (value := self._get(key)) is _MISSING:
+                    self.hits += 1
+                    return value
+
+                self.misses += 1
+
+            try:
+                value = fetch()
+
+                with self._lock:
+                    if not value is None:
+                        self._put(key, value)
+
+            finally:
+                with self._lock:
+                    self._fetch_locks.pop(key, None)
+
+        return value
+
+    def clear(self):
+        """Invalidates all cached entries
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: Hashable) -> Any:
+        """Returns unexpired value of key, marking it recently used (lock must be held)
+
+        Parameters
+        ----------
+        key : Hashable
+            cache key
+
+        Returns
+        -------
+        Any
+            cached value, or _MISSING if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+
+        cached_at, value = entry
+        if monotonic() - cached_at > self.max_age:
+            del self._entries[key]
+            return _MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: Hashable, value: Any):
+        """Caches value of key, evicting least recently used entries over size limit (lock must be
+        held)
+
+        Parameters
+        ----------
+        key : Hashable
+            cache key
+        value : Any
+            value to cache
+        """
+        self._entries[key] = (monotonic(), value)
+        self._entries.move_to_end(key)
+
+        if not self.max_entries is None:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
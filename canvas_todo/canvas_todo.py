@@ -1,87 +1,533 @@
+import os
+import time
+import asyncio
+import contextlib
 import threading
 import collections
-from typing import Any, Dict, List
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
 
 import keyring
+import requests
 from canvasapi import Canvas
 from canvasapi.course import Course
-from colored import fore, style
 
-from .todo import GKeep, Task, Completed, Update
-from .assignments import get_assignments
-from .utils import get_courses_from_ids
-from .config import get_app_config, get_canvas_config, get_gkeep_config
+from .todo import TodoBase, GKeep, SqliteTodo, Task, Update
+from .assignments import iter_assignments_async
+from .diff import diff_course_tasks
+from .utils import get_courses_from_ids, set_canvas_session, run_shared
+from .cache import AssignmentCache, CourseCache, SharedCourseCache
+from .scheduler import Scheduler
+from .transport import CanvasSession
+from .events import EventReceiver
+from .metrics import Metrics, NullMetrics
+from .todo.task import parse_todo_str
+from .utils import time_utils
+from .config import AccountConfig
+from .config.config_paths import (
+    CONF_DIR, ASSIGNMENT_CACHE_FILE, COURSE_CACHE_FILE, GKEEP_STATE_FILE, SQLITE_TODO_FILE
+)
+
+# app config keys of clients, caches and listeners created at startup, only applied on restart
+RESTART_KEYS = [
+    "todo_backend", "todo_conf", "cache_conf", "course_cache_conf", "transport_conf", "push_conf",
+    "metrics_conf"
+]
 
 
 class CanvasTodo(threading.Thread):
     """CanvasTodo main class
     """
+    config: Optional[AccountConfig]
     canvas_conf: Dict[str, Any]
     app_conf: Dict[str, Any]
     gkeep_conf: Dict[str, Any]
     canv: Canvas
-    todo: GKeep
+    todo: TodoBase
+    cache: Optional[AssignmentCache]
+    course_cache: Optional[CourseCache]
+    shared_cache: Optional[SharedCourseCache]
+    scheduler: Scheduler
+    metrics: Metrics
     courses = List[Course]
+    unavailable_courses: Set[int]
+    init_times: Dict[str, float]
 
-    def __init__(self):
+    def __init__(
+            self,
+            conf_dir: str = CONF_DIR,
+            session: Optional[requests.Session] = None,
+            shared_cache: Optional[SharedCourseCache] = None
+    ):
         """Initializes CanvasTodo class
+
+        Parameters
+        ----------
+        conf_dir : str
+            directory containing configs of account [default: .config]
+        session : Optional[requests.Session]
+            HTTP session to share with other accounts on the same canvas host
+        shared_cache : Optional[SharedCourseCache]
+            cache of course-level data to share with other accounts on the same canvas host
         """
         # init thread
         super().__init__()
 
-        # get canvas conf
-        self.canvas_conf = get_canvas_config()
+        # init startup time breakdown
+        self.init_times = {}
+        self.shared_cache = shared_cache
 
-        # get app conf
-        self.app_conf = get_app_config()
+        # get canvas, app and gkeep confs (gkeep conf only if keep is the todo backend)
+        self.config = self._timed("load_configs", AccountConfig, conf_dir)
+        self.canvas_conf = self.config.canvas_conf
+        self.app_conf = self.config.app_conf
+        self.gkeep_conf = self.config.gkeep_conf
 
-        # get gkeep conf
-        self.gkeep_conf = get_gkeep_config()
+        # create metrics (if enabled)
+        self.metrics = (
+            Metrics(**{
+                key: os.path.join(conf_dir, path)
+                for key, path in self.app_conf["metrics_conf"].items()
+            })
+            if "metrics_conf" in self.app_conf else NullMetrics()
+        )
 
         # create canvas obj
-        self.canv = Canvas(
-            self.canvas_conf["api_url"],
-            keyring.get_password('canvas-token', self.canvas_conf["api_username"])
+        self.canv = self._timed(
+            "canvas_client",
+            lambda: Canvas(
+                self.canvas_conf["api_url"],
+                keyring.get_password('canvas-token', self.canvas_conf["api_username"])
+            )
         )
+        # send canvas requests through rate limit aware session (shared, if supplied)
+        set_canvas_session(
+            self.canv,
+            CanvasSession(**self.app_conf.get("transport_conf", {})) if session is None else session
+        )
+        self.metrics.instrument_canvas(self.canv)
 
-        # create todo obj (gkeep)
-        self.todo = GKeep(self.gkeep_conf)
+        # create course cache (if enabled)
+        self.course_cache = (
+            CourseCache(
+                os.path.join(conf_dir, COURSE_CACHE_FILE), **self.app_conf["course_cache_conf"]
+            )
+            if "course_cache_conf" in self.app_conf else None
+        )
+
+        # log in to google keep, get user and get list of courses in parallel
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            todo_future = executor.submit(
+                self._timed, "todo_init", self._create_todo, conf_dir
+            )
+            user_future = executor.submit(
+                self._timed, "canvas_user", self.canv.get_current_user
+            )
+            courses_future = executor.submit(
+                self._timed,
+                "canvas_courses",
+                get_courses_from_ids,
+                self.canv,
+                self.app_conf["classes"],
+                self.course_cache,
+                self.app_conf.get("max_in_flight", 4),
+                shared_cache
+            )
+
+        # create todo obj
+        self.todo = todo_future.result()
+        if isinstance(self.todo, GKeep):
+            self.metrics.instrument_keep(self.todo.keep)
 
         # get user
-        self.user = self.canv.get_current_user()
+        self.user = user_future.result()
+
+        # get list of courses, remembering those canvas refused (deleted, or no longer accessible)
+        self.courses = courses_future.result()
+        self.unavailable_courses = (
+            set(self.app_conf["classes"]) - {course.id for course in self.courses}
+        )
+
+        # create submission cache (if enabled), ignoring max_entries of older configs
+        self.cache = (
+            AssignmentCache(
+                os.path.join(conf_dir, ASSIGNMENT_CACHE_FILE),
+                self.app_conf["cache_conf"].get("max_age")
+            )
+            if "cache_conf" in self.app_conf else None
+        )
+
+        # create sync scheduler
+        self.scheduler = Scheduler(
+            self.app_conf["update_rate"], **self.app_conf.get("schedule_conf", {})
+        )
+
+    def _create_todo(self, conf_dir: str) -> TodoBase:
+        """Creates todo backend selected by todo_backend in app config [default: gkeep]
+
+        Parameters
+        ----------
+        conf_dir : str
+            directory containing configs of account
+
+        Returns
+        -------
+        TodoBase
+            todo backend
+        """
+        backend = self.app_conf.get("todo_backend", "gkeep")
+        todo_conf = self.app_conf.get("todo_conf", {})
+
+        # google keep, logs in and syncs
+        if backend == "gkeep":
+            return GKeep(self.gkeep_conf, os.path.join(conf_dir, GKEEP_STATE_FILE))
+
+        # local sqlite database
+        elif backend == "sqlite":
+            return SqliteTodo(os.path.join(conf_dir, todo_conf.get("path", SQLITE_TODO_FILE)))
+
+        raise ValueError(f"Unknown todo backend: {backend}")
+
+    def _timed(self, step: str, func: Callable, *args: Any) -> Any:
+        """Runs step of initialization, recording time taken in init_times
+
+        Parameters
+        ----------
+        step : str
+            name of step
+        func : Callable
+            function running step
+        *args : Any
+            arguments of function
+
+        Returns
+        -------
+        Any
+            result of function
+        """
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.init_times[step] = time.perf_counter() - start
+
+    def reload_config(self) -> bool:
+        """Applies changes of config files to running instance
+
+        Courses removed from the app config are dropped and courses added to it are left to
+        fetch_missing_courses, while other app config changes take effect from the next sync.
+        Canvas and google keep clients aren't rebuilt, so changes to canvas and gkeep configs, and
+        to app config keys of clients, caches and listeners (RESTART_KEYS), are only applied on
+        restart. Invalid configs are reported and ignored until their files change again
+
+        Returns
+        -------
+        bool
+            true if app config was updated
+        """
+        if self.config is None or not self.config.changed():
+            return False
+
+        try:
+            self.config.reload()
+
+        except (OSError, ValueError) as exc:
+            print(f"Ignoring config change, keeping current config: {exc}")
+            return False
+
+        old_conf, app_conf = self.app_conf, dict(self.config.app_conf)
+
+        # keep settings of clients created at startup
+        restart = [
+            key for key in RESTART_KEYS if old_conf.get(key) != app_conf.get(key)
+        ] + [
+            conf_file for conf_file, old, new in (
+                ("canvas config", self.canvas_conf, self.config.canvas_conf),
+                ("gkeep config", self.gkeep_conf, self.config.gkeep_conf)
+            ) if old != new
+        ]
+        for key in RESTART_KEYS:
+            if key in old_conf:
+                app_conf[key] = old_conf[key]
+            else:
+                app_conf.pop(key, None)
+
+        # push mode polls at its own rate, set from update rate at startup
+        schedule_changed = any(
+            old_conf.get(key) != app_conf.get(key) for key in ("update_rate", "schedule_conf")
+        )
+        if schedule_changed and "push_conf" in app_conf:
+            restart.append("update_rate/schedule_conf (push mode)")
+
+        elif schedule_changed:
+            self.scheduler = Scheduler(app_conf["update_rate"], **app_conf.get("schedule_conf", {}))
+
+        if len(restart) > 0:
+            print(f"Config changes to {', '.join(restart)} will apply on restart")
+
+        # drop removed courses, added ones are fetched with other missing courses (retrying
+        # courses canvas refused before, as the config changed)
+        self.courses = [course for course in self.courses if course.id in app_conf["classes"]]
+        self.unavailable_courses = set()
+        self.app_conf = app_conf
+
+        if app_conf["console_print"]:
+            added = [
+                course_id for course_id in app_conf["classes"]
+                if not course_id in old_conf["classes"]
+            ]
+            print(f"Reloaded config ({len(added)} courses added)")
+
+        return True
+
+    def fetch_missing_courses(self) -> int:
+        """Fetches courses of app config that aren't loaded yet
 
-        # get list of courses
-        self.courses = get_courses_from_ids(self.canv, self.app_conf["classes"])
+        Covers courses added to the app config, as well as courses whose fetch failed before (e.g.
+        on a network error), so they're retried every sync. Courses canvas refused (deleted, or no
+        longer accessible) aren't retried until the config changes again
+
+        Returns
+        -------
+        int
+            number of courses fetched
+        """
+        loaded = {course.id for course in self.courses}
+        missing = [
+            course_id for course_id in self.app_conf["classes"]
+            if not (course_id in loaded or course_id in self.unavailable_courses)
+        ]
+        if len(missing) == 0:
+            return 0
+
+        courses = self.courses + get_courses_from_ids(
+            self.canv,
+            missing,
+            self.course_cache,
+            self.app_conf.get("max_in_flight", 4),
+            self.shared_cache
+        )
+
+        # keep courses in config order
+        order = {course_id: idx for idx, course_id in enumerate(self.app_conf["classes"])}
+        self.courses = sorted(courses, key=lambda course: order[course.id])
+
+        # skipped courses were refused by canvas, rather than failing to fetch
+        self.unavailable_courses.update(
+            set(missing) - {course.id for course in self.courses}
+        )
+
+        return len(self.courses) - len(loaded)
 
     def run(self):
         """Runs CanvasTodo thread
 
-        Get assignments, (maybe) prints to console, (tbd) updates todo list on google keep
+        Syncs, then sleeps until the next scheduled tick, forever. In push mode (push_conf in app
+        config), courses are also resynced as canvas events about them arrive
         """
+        if "push_conf" in self.app_conf:
+            return self.run_push()
+
         # inf run loop
         while True:
-            # get updated canvas tasks
-            canvas_tasks = get_assignments(
-                self.courses, self.user, **self.app_conf["assignments_conf"]
-            )
+            self.sync()
 
-            # print assignments
-            if self.app_conf["console_print"]:
-                self.print_assignments(canvas_tasks)
+            # sleep until next tick (about <update_rate> seconds, adapted to activity)
+            self.scheduler.wait()
 
-            # get todo state
-            todo_dict = self.todo.request_todo_state(self.app_conf["classes"])
+    def run_push(self):
+        """Runs CanvasTodo thread in push mode
 
-            # generate dictionary of updates to todo state with assignments
-            update_dict = self.gen_update_todo_dict(todo_dict, canvas_tasks)
+        Listens for canvas events, resyncing just the affected courses as they arrive. Full syncs
+        still run at the ticks of the scheduler (about every <poll_rate> seconds), as a safety net
+        for missed events
+        """
+        push_conf = dict(self.app_conf["push_conf"])
+        debounce = push_conf.pop("debounce", 1)
 
-            # set todo state
-            self.todo.post_todo_state(update_dict, self.app_conf["classes"])
+        # poll less often, as events bring changes in between
+        self.scheduler = Scheduler(
+            push_conf.pop("poll_rate", 6 * self.app_conf["update_rate"]),
+            **self.app_conf.get("schedule_conf", {})
+        )
 
-            # sleep for <update_rate> minutes
-            sleep(self.app_conf["update_rate"])
+        # start event receiver
+        receiver = EventReceiver(**push_conf)
+        receiver.start()
+        if self.app_conf["console_print"]:
+            print(f"Listening for canvas events on {receiver.host}:{receiver.port}")
 
+        # inf run loop
+        while True:
+            self.sync()
+            next_poll = self.scheduler.next_tick()
+
+            # resync courses of events until next full sync
+            while (timeout := next_poll - time.monotonic()) > 0:
+                # ignore events of courses that aren't configured
+                course_ids = receiver.wait(timeout, debounce) & set(self.app_conf["classes"])
+                if len(course_ids) > 0:
+                    self.sync(course_ids)
+
+    def sync(self, course_ids: Optional[Set[int]] = None):
+        """Runs one sync cycle
+
+        Get assignments, (maybe) prints to console, updates todo list on google keep
+
+        Parameters
+        ----------
+        course_ids : Optional[Set[int]]
+            IDs of courses to resync, all courses if None
+        """
+        # run on event loop (and worker threads) shared by every account of process
+        run_shared(self.sync_async(course_ids))
+
+    async def sync_async(self, course_ids: Optional[Set[int]] = None):
+        """Runs one sync cycle in event loop
+
+        Reads todo state while assignments are fetched, then diffs and applies updates of each course
+        as soon as it is fetched, while later courses are still fetching. Updates are synced with
+        google keep once, after every course is applied
+
+        Parameters
+        ----------
+        course_ids : Optional[Set[int]]
+            IDs of courses to resync (e.g. named by canvas events), all courses if None
+        """
+        # apply changes of config files, and fetch courses added or not fetched yet
+        await asyncio.to_thread(self.reload_config)
+        await asyncio.to_thread(self.fetch_missing_courses)
+
+        # get courses to sync
+        courses, classes = self.courses, self.app_conf["classes"]
+        if not course_ids is None:
+            courses = [course for course in courses if course.id in course_ids]
+            classes = {course.id: classes[course.id] for course in courses}
+
+        async def get_todo_dict() -> Dict[int, List[Task]]:
+            with self.metrics.phase("request_todo_state"):
+                return await self.todo.request_todo_state_async(classes)
+
+        # read todo state in background while canvas is fetched
+        todo_future = asyncio.ensure_future(get_todo_dict())
+
+        # init canvas tasks and update dict
+        canvas_tasks = {}
+        update_dict = collections.defaultdict(lambda: collections.defaultdict(list))
+        self.todo.begin_post()
+
+        async def apply_course_tasks():
+            # diff and apply updates of each course as it finishes fetching
+            fetch_start = time.perf_counter()
+            async with contextlib.aclosing(iter_assignments_async(
+                    courses,
+                    self.user,
+                    self.app_conf.get("max_in_flight", 1),
+                    self.cache,
+                    sort=self.app_conf["console_print"],  # only printing needs due date order
+                    shared_cache=self.shared_cache,
+                    **self.app_conf["assignments_conf"]
+            )) as course_stream:
+                async for course, course_canv_tasks in course_stream:
+                    # only count time spent waiting on canvas as fetch time
+                    self.metrics.inc(
+                        "canvas_todo_phase_seconds_total",
+                        time.perf_counter() - fetch_start,
+                        phase="get_assignments"
+                    )
+                    canvas_tasks[course] = course_canv_tasks
+
+                    # print assignments
+                    if self.app_conf["console_print"]:
+                        self.print_assignments({course: course_canv_tasks})
+
+                    # generate updates to todo state of course
+                    todo_dict = await todo_future
+                    with self.metrics.phase("gen_update_todo_dict"):
+                        update_dict[course.id] = diff_course_tasks(
+                            todo_dict[course.id], course_canv_tasks
+                        )
+
+                    # apply updates of course to local todo state
+                    with self.metrics.phase("post_todo_state"):
+                        await asyncio.to_thread(
+                            self.todo.post_course_state,
+                            course.id,
+                            update_dict[course.id],
+                            classes[course.id]
+                        )
+
+                    fetch_start = time.perf_counter()
+
+            # todo state is still needed if there were no courses to fetch
+            await todo_future
+
+        try:
+            await apply_course_tasks()
+
+        except Exception:
+            # let todo state read finish (ignoring its failure), as it may still be reading notes
+            await asyncio.gather(todo_future, return_exceptions=True)
+
+            # write updates of courses already applied, rather than leave them half applied
+            if len(update_dict) > 0:
+                await asyncio.to_thread(self.todo.flush)
+
+            raise
+
+        # evict expired submissions from assignment cache
+        if self.cache is not None:
+            self.cache.prune()
+
+        # set todo state
+        with self.metrics.phase("post_todo_state"):
+            def post_remaining_courses():
+                # ensure notes of courses without canvas tasks exist
+                for course_id, course_params in classes.items():
+                    if not course_id in update_dict:
+                        self.todo.post_course_state(
+                            course_id, update_dict[course_id], course_params
+                        )
+
+                self.todo.flush()
+
+            await asyncio.to_thread(post_remaining_courses)
+
+        # report writes to todo
+        if self.app_conf["console_print"]:
+            print(f"Wrote {self.todo.items_written} items in {self.todo.notes_written} notes")
+        self.metrics.inc("canvas_todo_keep_notes_written_total", self.todo.notes_written)
+        self.metrics.inc("canvas_todo_keep_items_written_total", self.todo.items_written)
+
+        # adapt schedule to full sync cycles (restoring course order of canvas tasks)
+        if course_ids is None:
+            self.scheduler.record(
+                {course: canvas_tasks[course] for course in courses if course in canvas_tasks},
+                update_dict
+            )
+
+        # write cycle metrics
+        if self.metrics.enabled:
+            self.record_cache_metrics()
+            self.metrics.end_cycle()
+
+    def record_cache_metrics(self):
+        """Records hit rates of submission, shared course and parse caches
+        """
+        if self.cache is not None:
+            self.metrics.observe_cache("submissions", self.cache.hits, self.cache.misses)
+        if not self.shared_cache is None:
+            self.metrics.observe_cache(
+                "shared_course", self.shared_cache.hits, self.shared_cache.misses
+            )
+
+        for name, func in (
+                ("parse_todo_str", parse_todo_str),
+                ("from_iso8601", time_utils.from_iso8601),
+                ("from_due_date_str", time_utils.from_due_date_str)
+        ):
+            cache_info = func.cache_info()
+            self.metrics.observe_cache(name, cache_info.hits, cache_info.misses)
 
     @staticmethod
     def print_assignments(asssignments: Dict[Course, List[Task]]):
@@ -92,6 +538,9 @@ class CanvasTodo(threading.Thread):
         asssignments : Dict[Course, List[Task]]
             assignments to print
         """
+        # only load colored when printing
+        from colored import fore, style
+
         for course, course_assignments in asssignments.items():
             print(f"{fore.GREEN}{style.BOLD}{course.name}:{style.RESET}")
 
@@ -120,27 +569,9 @@ class CanvasTodo(threading.Thread):
         # init update dict
         update_dict = collections.defaultdict(lambda: collections.defaultdict(list))
 
-        # iterate over courses
+        # diff tasks of each course
         for course, course_canv_tasks in canvas_tasks.items():
-            # get todo tasks for course
-            todo_tasks = todo_dict[course.id]
-
-            # iterate over canvas tasks
-            for canv_task in course_canv_tasks:
-                # check if task exists in todo tasks
-                if not canv_task in todo_tasks:
-                    # check if same task exists, but is marked incomplete in todo
-                    if (
-                            (canv_task.name, canv_task.due_date) in
-                            [(t.name, t.due_date) for t in todo_tasks]
-                    ):
-                        # mark task as complete in todo if complete in canvas
-                        if canv_task.completed == Completed.COMPLETE:
-                            update_dict[course.id][Update.MARK_COMPLETE].append(canv_task)
-
-                    else:
-                        # if task does not exist at all in todo, add it
-                        update_dict[course.id][Update.ADD].append(canv_task)
+            update_dict[course.id] = diff_course_tasks(todo_dict[course.id], course_canv_tasks)
 
         # return update dict
         return update_dict
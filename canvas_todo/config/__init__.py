@@ -1,2 +1,32 @@
-from .gen_config import gen_config
-from .get_config import get_app_config, get_gkeep_config, get_canvas_config
+import importlib
+
+
+# config functions and model are imported on first access, so that importing config paths doesn't
+# load yaml, canvasapi or gkeepapi
+_LAZY_ATTRS = {
+    "gen_config": ".gen_config",
+    "get_app_config": ".get_config",
+    "get_gkeep_config": ".get_config",
+    "get_canvas_config": ".get_config",
+    "AccountConfig": ".model"
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    """Imports config function on first access
+
+    Parameters
+    ----------
+    name : str
+        function name
+    """
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+
+        # bind function to package, shadowing submodule of same name (gen_config)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,3 +1,18 @@
-APP_CONF_PATH = ".config/app.yaml"
-GKEEP_CONF_PATH = ".config/gkeep.yaml"
-CANVAS_CONF_PATH = ".config/canvas.yaml"
+import os
+
+CONF_DIR = ".config"
+PROFILES_DIR = os.path.join(CONF_DIR, "profiles")
+
+APP_CONF_FILE = "app.yaml"
+GKEEP_CONF_FILE = "gkeep.yaml"
+CANVAS_CONF_FILE = "canvas.yaml"
+ASSIGNMENT_CACHE_FILE = "assignments.db"
+COURSE_CACHE_FILE = "courses.db"
+GKEEP_STATE_FILE = "gkeep_state.json"
+SQLITE_TODO_FILE = "todo.db"
+
+APP_CONF_PATH = os.path.join(CONF_DIR, APP_CONF_FILE)
+GKEEP_CONF_PATH = os.path.join(CONF_DIR, GKEEP_CONF_FILE)
+CANVAS_CONF_PATH = os.path.join(CONF_DIR, CANVAS_CONF_FILE)
+ASSIGNMENT_CACHE_PATH = os.path.join(CONF_DIR, ASSIGNMENT_CACHE_FILE)
+COURSE_CACHE_PATH = os.path.join(CONF_DIR, COURSE_CACHE_FILE)
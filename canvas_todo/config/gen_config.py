@@ -8,41 +8,53 @@ import gkeepapi
 from getpass import getpass
 from canvasapi import Canvas
 
-from .config_paths import APP_CONF_PATH, GKEEP_CONF_PATH, CANVAS_CONF_PATH
-from ..utils import time_utils
+from .config_paths import CONF_DIR, APP_CONF_FILE, GKEEP_CONF_FILE, CANVAS_CONF_FILE
+from .get_config import ConfigLoader
+from ..utils import time_utils, set_canvas_session
+from ..transport import CanvasSession
 
 
-def gen_config():
+def gen_config(conf_dir: os.PathLike = CONF_DIR):
     """Generates yaml config from user input
+
+    Parameters
+    ----------
+    conf_dir : os.PathLike
+        directory to write configs to [default: .config]
     """
     # create config dir if it doesn't exist
-    os.makedirs(os.path.split(APP_CONF_PATH)[0], exist_ok=True)
+    os.makedirs(conf_dir, exist_ok=True)
 
-    # generate configs
-    gen_gkeep_config()
-    canvas_conf = gen_canvas_config()
-    gen_app_config(canvas_conf)
+    # generate configs (gkeep config only if keep is the todo backend)
+    canvas_conf = gen_canvas_config(conf_dir)
+    app_conf = gen_app_config(canvas_conf, conf_dir)
+    if app_conf.get("todo_backend", "gkeep") == "gkeep":
+        gen_gkeep_config(conf_dir)
 
-def gen_app_config(canvas_conf: Dict) -> Dict:
+def gen_app_config(canvas_conf: Dict, conf_dir: os.PathLike = CONF_DIR) -> Dict:
     """Generates yaml config from user input for app operation
 
     Paramters
     ---------
     canvas_conf : Dict
         canvas configuration dictionary, used to get classes to monitor
+    conf_dir : os.PathLike
+        directory to write config to [default: .config]
 
     Returns
     -------
     Dict
         app config dictionary
     """
+    app_conf_path = os.path.join(conf_dir, APP_CONF_FILE)
+
     # check for existing app config
     if (
-            os.path.exists(APP_CONF_PATH) and
+            os.path.exists(app_conf_path) and
             (input("Delete existing app config and restart [y/N]?: ").lower() != "y")
     ):
-        with open(APP_CONF_PATH, "r") as app_conf_in:
-            return yaml.load(app_conf_in, Loader=yaml.Loader)
+        with open(app_conf_path, "r") as app_conf_in:
+            return yaml.load(app_conf_in, Loader=ConfigLoader)
 
     # init app conf
     app_conf = {}
@@ -52,14 +64,41 @@ def gen_app_config(canvas_conf: Dict) -> Dict:
         input("App update rate in minutes [default: 30 min]: ") or 30
     )
 
+    # get max courses fetched concurrently [default: 4]
+    app_conf["max_in_flight"] = int(
+        input("Max courses fetched concurrently [default: 4]: ") or 4
+    )
+
+    # get submission cache config [default: full resync daily]
+    if input("Cache submissions on disk [Y/n]?: ").lower() != "n":
+        app_conf["cache_conf"] = {
+            "max_age": 60 * 60 * float(
+                input("  Cache max age in hours [default: 24 hours]: ") or 24
+            )
+        }
+
+    # get course metadata cache config [default: refetch courses weekly]
+    if input("Cache course metadata on disk [Y/n]?: ").lower() != "n":
+        app_conf["course_cache_conf"] = {
+            "max_age": 60 * 60 * 24 * float(
+                input("  Course cache max age in days [default: 7 days]: ") or 7
+            )
+        }
+
+    # get todo backend [default: gkeep]
+    app_conf["todo_backend"] = (
+        input("Todo backend (gkeep, sqlite) [default: gkeep]: ").lower() or "gkeep"
+    )
+
     # get if should print to console
     app_conf["console_print"] = input("Print to console [Y/n]?: ").lower() != "n"
 
-    # create canvas obj
+    # create canvas obj, sending requests through rate limit aware session
     canv = Canvas(
         canvas_conf["api_url"],
         keyring.get_password('canvas-token', canvas_conf["api_username"])
     )
+    set_canvas_session(canv, CanvasSession())
 
     # init classes dict
     app_conf["classes"] = {}
@@ -71,13 +110,13 @@ def gen_app_config(canvas_conf: Dict) -> Dict:
 
     # get classes to watch
     # NOTE: only prompts for active courses with start dates within the last 6 months
-    for course in canv.get_courses(enrollment_state="active"):
+    for course in canv.get_courses(enrollment_state="active", per_page=100):
         # get time delta
         time_delt = datetime.now(timezone.utc) - time_utils.from_iso8601(course.created_at)
 
         # check if should include course
         if time_delt.days < (6*30) and input(f"Include {course.name} [Y/n]?: ").lower() != "n":
-            # get course parameters
+            # get course parameters (color stored as value, so config can be safely loaded)
             app_conf["classes"][course.id] = {
                 "nickname": input(f"  Course Nickname [default: {course.name}]: ") or course.name,
                 "color": getattr(
@@ -86,7 +125,7 @@ def gen_app_config(canvas_conf: Dict) -> Dict:
                         input(f"  Color (default: {colors[color_idx % len(colors)]}): ") or
                         colors[color_idx % len(colors)]
                     )
-                )
+                ).value
             }
 
             # increment color idx
@@ -98,22 +137,34 @@ def gen_app_config(canvas_conf: Dict) -> Dict:
     }
 
     # dump config
-    with open(APP_CONF_PATH, "w") as app_conf_out:
-        yaml.dump(app_conf, app_conf_out)
+    with open(app_conf_path, "w") as app_conf_out:
+        yaml.safe_dump(app_conf, app_conf_out)
 
     return app_conf
 
 
-def gen_gkeep_config():
+def gen_gkeep_config(conf_dir: os.PathLike = CONF_DIR) -> Dict:
     """Generates yaml config from user input for google keep interface
+
+    Parameters
+    ----------
+    conf_dir : os.PathLike
+        directory to write config to [default: .config]
+
+    Returns
+    -------
+    Dict
+        google keep config dict
     """
+    gkeep_conf_path = os.path.join(conf_dir, GKEEP_CONF_FILE)
+
     # check for existing gkeep config
     if (
-            os.path.exists(GKEEP_CONF_PATH) and
+            os.path.exists(gkeep_conf_path) and
             (input("Delete existing google keep config and restart [y/N] ?: ").lower() != "y")
     ):
-        with open(GKEEP_CONF_PATH, "r") as gkeep_conf_in:
-            return yaml.load(gkeep_conf_in, Loader=yaml.Loader)
+        with open(gkeep_conf_path, "r") as gkeep_conf_in:
+            return yaml.load(gkeep_conf_in, Loader=ConfigLoader)
 
     # init gkeep conf
     gkeep_conf = {}
@@ -128,27 +179,34 @@ def gen_gkeep_config():
     gkeep_conf["pin_notes"] = input("Pin notes [Y/n]?: ").lower() == "n"
 
     # dump config
-    with open(GKEEP_CONF_PATH, "w") as gkeep_conf_out:
-        yaml.dump(gkeep_conf, gkeep_conf_out)
+    with open(gkeep_conf_path, "w") as gkeep_conf_out:
+        yaml.safe_dump(gkeep_conf, gkeep_conf_out)
 
     return gkeep_conf
 
 
-def gen_canvas_config() -> Dict:
+def gen_canvas_config(conf_dir: os.PathLike = CONF_DIR) -> Dict:
     """Generates yaml config from user input for canvas interface
 
+    Parameters
+    ----------
+    conf_dir : os.PathLike
+        directory to write config to [default: .config]
+
     Returns
     -------
     Dict
         canvas config dict
     """
+    canvas_conf_path = os.path.join(conf_dir, CANVAS_CONF_FILE)
+
     # check for existing canvas config
     if (
-            os.path.exists(CANVAS_CONF_PATH) and
+            os.path.exists(canvas_conf_path) and
             (input("Delete existing canvas config and restart [y/N] ?: ").lower() != "y")
     ):
-        with open(CANVAS_CONF_PATH, "r") as canvas_conf_in:
-            return yaml.load(canvas_conf_in, Loader=yaml.Loader)
+        with open(canvas_conf_path, "r") as canvas_conf_in:
+            return yaml.load(canvas_conf_in, Loader=ConfigLoader)
 
     # init canvas conf
     canvas_conf = {}
@@ -159,7 +217,7 @@ def gen_canvas_config() -> Dict:
     keyring.set_password('canvas-token', canvas_conf["api_username"], getpass("Canvas Key: "))
 
     # dump config
-    with open(CANVAS_CONF_PATH, "w") as canvas_conf_out:
-        yaml.dump(canvas_conf, canvas_conf_out)
+    with open(canvas_conf_path, "w") as canvas_conf_out:
+        yaml.safe_dump(canvas_conf, canvas_conf_out)
 
     return canvas_conf
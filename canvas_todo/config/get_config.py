@@ -1,46 +1,102 @@
 import os
-from typing import Dict
+import copy
+import threading
+from typing import Any, Dict, Tuple
 
 import yaml
 
-from .config_paths import APP_CONF_PATH, GKEEP_CONF_PATH, CANVAS_CONF_PATH
+from .config_paths import CONF_DIR, APP_CONF_FILE, GKEEP_CONF_FILE, CANVAS_CONF_FILE
 
-def get_app_config() -> Dict:
+
+class ConfigLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+    """Safe yaml loader of configs, using libyaml if available
+
+    Configs written by older versions store google keep colors as pickled python objects, which are
+    read as their color values (e.g. RED) rather than constructed
+    """
+
+
+def _construct_color(loader: ConfigLoader, node: yaml.Node) -> str:
+    """Constructs color value of pickled google keep color
+
+    Parameters
+    ----------
+    loader : ConfigLoader
+        yaml loader
+    node : yaml.Node
+        node of pickled color, with color value as only argument
+
+    Returns
+    -------
+    str
+        color value
+    """
+    return loader.construct_sequence(node)[0]
+
+
+ConfigLoader.add_constructor(
+    "tag:yaml.org,2002:python/object/apply:gkeepapi.node.ColorValue", _construct_color
+)
+
+# parsed configs, keyed by path, with modification time and size they were parsed at
+_parsed: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+_parsed_lock = threading.Lock()
+
+
+def get_app_config(conf_dir: os.PathLike = CONF_DIR) -> Dict:
     """Gets app config from file
 
+    Parameters
+    ----------
+    conf_dir : os.PathLike
+        directory containing configs [default: .config]
+
     Returns
     -------
     Dict
         application config dictionary
     """
-    return _get_config(APP_CONF_PATH)
+    return _get_config(os.path.join(conf_dir, APP_CONF_FILE))
 
 
-def get_gkeep_config() -> Dict:
+def get_gkeep_config(conf_dir: os.PathLike = CONF_DIR) -> Dict:
     """Gets google keep config from file
 
+    Parameters
+    ----------
+    conf_dir : os.PathLike
+        directory containing configs [default: .config]
+
     Returns
     -------
     Dict
         google keep config dictionary
     """
-    return _get_config(GKEEP_CONF_PATH)
+    return _get_config(os.path.join(conf_dir, GKEEP_CONF_FILE))
 
 
-def get_canvas_config() -> Dict:
+def get_canvas_config(conf_dir: os.PathLike = CONF_DIR) -> Dict:
     """Gets canvas config from file
 
+    Parameters
+    ----------
+    conf_dir : os.PathLike
+        directory containing configs [default: .config]
+
     Returns
     -------
     Dict
         canvas config dictionary
     """
-    return _get_config(CANVAS_CONF_PATH)
+    return _get_config(os.path.join(conf_dir, CANVAS_CONF_FILE))
 
 
 def _get_config(conf_path: os.PathLike) -> Dict:
     """Gets yaml config at path
 
+    Configs are only parsed again once their file changes, so accounts, daemons and reloads reading
+    the same config share one parse
+
     Parameters
     ----------
     conf_path : os.PathLike
@@ -51,5 +107,19 @@ def _get_config(conf_path: os.PathLike) -> Dict:
     Dict
         contents of yaml config, as dict
     """
-    with open(conf_path, "r") as conf_file:
-        return yaml.load(conf_file, Loader=yaml.Loader)
+    stat = os.stat(conf_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    with _parsed_lock:
+        parsed = _parsed.get(os.fspath(conf_path))
+
+    # parse config if not yet parsed, or changed since
+    if parsed is None or parsed[0] != version:
+        with open(conf_path, "r") as conf_file:
+            parsed = (version, yaml.load(conf_file, Loader=ConfigLoader))
+
+        with _parsed_lock:
+            _parsed[os.fspath(conf_path)] = parsed
+
+    # copy, so callers can't modify cached config
+    return copy.deepcopy(parsed[1])
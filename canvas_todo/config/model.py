@@ -0,0 +1,241 @@
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+from .get_config import get_app_config, get_canvas_config, get_gkeep_config
+from .config_paths import CONF_DIR, APP_CONF_FILE, GKEEP_CONF_FILE, CANVAS_CONF_FILE
+
+
+# todo backends of app config
+TODO_BACKENDS = {"gkeep", "sqlite"}
+
+# expected types of config keys, keyed by whether key is required
+CANVAS_SCHEMA = {
+    True: {"api_url": str, "api_username": str},
+    False: {}
+}
+APP_SCHEMA = {
+    True: {
+        "update_rate": (int, float),
+        "console_print": bool,
+        "classes": dict,
+        "assignments_conf": dict
+    },
+    False: {
+        "max_in_flight": int,
+        "todo_backend": str,
+        "todo_conf": dict,
+        "cache_conf": dict,
+        "course_cache_conf": dict,
+        "schedule_conf": dict,
+        "transport_conf": dict,
+        "push_conf": dict,
+        "metrics_conf": dict
+    }
+}
+GKEEP_SCHEMA = {
+    True: {"api_username": str, "pin_notes": bool},
+    False: {"max_skipped_syncs": int, "uncheck_incomplete": bool}
+}
+
+
+class AccountConfig:
+    """Validated canvas, app and google keep configs of one account
+
+    Configs are parsed (with the safe, C yaml loader) and validated once, then kept in memory.
+    Their files are watched by modification time, so a running instance can reload them when they
+    change instead of restarting
+    """
+    conf_dir: str
+    canvas_conf: Dict[str, Any]
+    app_conf: Dict[str, Any]
+    gkeep_conf: Dict[str, Any]
+
+    def __init__(self, conf_dir: str = CONF_DIR):
+        """Loads and validates configs of account
+
+        Parameters
+        ----------
+        conf_dir : str
+            directory containing configs of account [default: .config]
+
+        Raises
+        ------
+        ValueError
+            if a config is invalid
+        """
+        self.conf_dir = conf_dir
+        self._versions = {}
+        self.reload()
+
+    def changed(self) -> bool:
+        """Checks if any config file changed since configs were last loaded
+
+        Returns
+        -------
+        bool
+            true if a config file was modified, created or deleted
+        """
+        return self._stat() != self._versions
+
+    def reload(self):
+        """Loads and validates configs, keeping current configs if they are invalid
+
+        Raises
+        ------
+        OSError
+            if a required config can't be read
+        ValueError
+            if a config is invalid
+        """
+        # record versions before reading, so a change made while reading is reloaded again later,
+        # and an invalid change isn't retried until it is edited
+        self._versions = self._stat()
+
+        try:
+            canvas_conf = _validate(
+                CANVAS_CONF_FILE, get_canvas_config(self.conf_dir), CANVAS_SCHEMA
+            )
+            app_conf = _validate_app_config(get_app_config(self.conf_dir))
+
+            # gkeep conf only if keep is the todo backend
+            gkeep_conf = (
+                _validate(GKEEP_CONF_FILE, get_gkeep_config(self.conf_dir), GKEEP_SCHEMA)
+                if app_conf.get("todo_backend", "gkeep") == "gkeep" else {}
+            )
+
+        except yaml.YAMLError as exc:
+            raise ValueError(f"Invalid yaml in config: {exc}") from exc
+
+        self.canvas_conf, self.app_conf, self.gkeep_conf = canvas_conf, app_conf, gkeep_conf
+
+    def _stat(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        """Gets modification time and size of each config file
+
+        Returns
+        -------
+        Dict[str, Optional[Tuple[int, int]]]
+            modification time and size of config files (None if missing), keyed by file name
+        """
+        versions = {}
+        for conf_file in (CANVAS_CONF_FILE, APP_CONF_FILE, GKEEP_CONF_FILE):
+            try:
+                stat = os.stat(os.path.join(self.conf_dir, conf_file))
+                versions[conf_file] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                versions[conf_file] = None
+
+        return versions
+
+
+def _validate_app_config(app_conf: Any) -> Dict[str, Any]:
+    """Validates app config, normalizing course IDs to ints and course colors to color values
+
+    Parameters
+    ----------
+    app_conf : Any
+        app config, as parsed
+
+    Returns
+    -------
+    Dict[str, Any]
+        validated app config
+
+    Raises
+    ------
+    ValueError
+        if app config is invalid
+    """
+    app_conf = _validate(APP_CONF_FILE, app_conf, APP_SCHEMA)
+
+    if not app_conf.get("todo_backend", "gkeep") in TODO_BACKENDS:
+        raise ValueError(
+            f"{APP_CONF_FILE}: todo_backend must be one of {sorted(TODO_BACKENDS)}, "
+            f"not {app_conf['todo_backend']!r}"
+        )
+
+    # validate parameters of each course
+    classes = {}
+    for course_id, course_params in app_conf["classes"].items():
+        try:
+            course_id = int(course_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"{APP_CONF_FILE}: course ID {course_id!r} must be an integer")
+
+        if not (isinstance(course_params, dict) and isinstance(course_params.get("nickname"), str)):
+            raise ValueError(f"{APP_CONF_FILE}: course {course_id} must have a nickname")
+
+        # colors set in python may still be google keep colors
+        color = getattr(course_params.get("color"), "value", course_params.get("color"))
+        if not isinstance(color, str):
+            raise ValueError(f"{APP_CONF_FILE}: course {course_id} must have a color")
+
+        classes[course_id] = {**course_params, "color": color}
+
+    app_conf["classes"] = classes
+    return app_conf
+
+
+def _validate(conf_file: str, conf: Any, schema: Dict[bool, Dict[str, Any]]) -> Dict[str, Any]:
+    """Validates types of config keys against schema
+
+    Keys not in schema are allowed, and left unchecked
+
+    Parameters
+    ----------
+    conf_file : str
+        file name of config, for error messages
+    conf : Any
+        config, as parsed
+    schema : Dict[bool, Dict[str, Any]]
+        expected types of config keys, keyed by whether key is required
+
+    Returns
+    -------
+    Dict[str, Any]
+        validated config
+
+    Raises
+    ------
+    ValueError
+        if a required key is missing, or a key has the wrong type
+    """
+    if not isinstance(conf, dict):
+        raise ValueError(f"{conf_file}: config must be a mapping")
+
+    for required, key_types in schema.items():
+        for key, key_type in key_types.items():
+            if not key in conf:
+                if required:
+                    raise ValueError(f"{conf_file}: missing {key}")
+                continue
+
+            # bools are ints in python, so don't accept them as numbers
+            if not isinstance(conf[key], key_type) or (
+                    isinstance(conf[key], bool) and not key_type is bool
+            ):
+                raise ValueError(
+                    f"{conf_file}: {key} must be {_type_name(key_type)}, not {conf[key]!r}"
+                )
+
+    return conf
+
+
+def _type_name(key_type: Any) -> str:
+    """Gets readable name of expected type(s)
+
+    Parameters
+    ----------
+    key_type : Any
+        type, or tuple of types
+
+    Returns
+    -------
+    str
+        type name(s)
+    """
+    if isinstance(key_type, tuple):
+        return " or ".join(t.__name__ for t in key_type)
+
+    return key_type.__name__
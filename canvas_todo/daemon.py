@@ -0,0 +1,156 @@
+import os
+import collections
+import asyncio
+import traceback
+from time import monotonic
+from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from .canvas_todo import CanvasTodo
+from .cache import SharedCourseCache
+from .transport import CanvasSession
+from .config import get_app_config, get_canvas_config
+from .config.config_paths import PROFILES_DIR
+
+
+class Daemon:
+    """Serves many account profiles from one process
+
+    Each profile is a directory of configs (app.yaml, canvas.yaml, gkeep.yaml) under the profiles
+    directory. Syncs of every account are scheduled on a shared worker pool, and accounts on the
+    same canvas host share one HTTP session (and optionally a cache of course-level data)
+    """
+    accounts: Dict[str, CanvasTodo]
+    sessions: Dict[str, CanvasSession]
+    shared_caches: Dict[str, SharedCourseCache]
+    max_workers: int
+
+    def __init__(
+            self,
+            profiles_dir: str = PROFILES_DIR,
+            max_workers: int = 4,
+            shared_cache_age: Optional[float] = None
+    ):
+        """Initializes daemon, logging in to every account profile in parallel
+
+        Parameters
+        ----------
+        profiles_dir : str
+            directory containing a config directory per account [default: .config/profiles]
+        max_workers : int
+            number of worker threads shared by all accounts
+        shared_cache_age : Optional[float]
+            seconds course assignments are shared between accounts of a canvas host, not shared if
+            None
+        """
+        self.max_workers = max_workers
+
+        # get profile config directories
+        profile_dirs = {
+            name: os.path.join(profiles_dir, name)
+            for name in sorted(os.listdir(profiles_dir))
+            if os.path.isdir(os.path.join(profiles_dir, name))
+        }
+
+        # get canvas host of each profile
+        profile_hosts = {
+            name: get_canvas_config(conf_dir)["api_url"]
+            for name, conf_dir in profile_dirs.items()
+        }
+        host_counts = collections.Counter(profile_hosts.values())
+
+        # create one session and shared cache per canvas host (configured by first profile on host)
+        self.sessions = {}
+        self.shared_caches = {}
+        for name, conf_dir in profile_dirs.items():
+            api_url = profile_hosts[name]
+            if not api_url in self.sessions:
+                self.sessions[api_url] = CanvasSession(
+                    **get_app_config(conf_dir).get("transport_conf", {}),
+                    n_accounts=host_counts[api_url]
+                )
+                if not shared_cache_age is None:
+                    self.shared_caches[api_url] = SharedCourseCache(shared_cache_age)
+
+        # init accounts in parallel (each logs in and fetches courses)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                name: executor.submit(
+                    CanvasTodo,
+                    conf_dir,
+                    self.sessions[profile_hosts[name]],
+                    self.shared_caches.get(profile_hosts[name])
+                )
+                for name, conf_dir in profile_dirs.items()
+            }
+
+        self.accounts = {}
+        for name, future in futures.items():
+            try:
+                self.accounts[name] = future.result()
+            except Exception:
+                print(f"Failed to initialize account {name}, skipping")
+                traceback.print_exc()
+
+    def run(self):
+        """Runs syncs of every account forever
+
+        Each account is synced again at the next tick of its scheduler. A failed sync is reported
+        and retried on the next tick, without affecting other accounts
+        """
+        if len(self.accounts) == 0:
+            return
+
+        # schedule every account to sync now
+        next_sync = {name: monotonic() for name in self.accounts}
+        running: Dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                # submit due syncs
+                now = monotonic()
+                for name, sync_time in list(next_sync.items()):
+                    if sync_time <= now:
+                        del next_sync[name]
+                        running[executor.submit(self.accounts[name].sync)] = name
+
+                # wait until a sync finishes or the next sync is due
+                timeout = max(0, min(next_sync.values()) - monotonic()) if next_sync else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                # reschedule finished accounts
+                for future in done:
+                    name = running.pop(future)
+                    if not (e := future.exception()) is None:
+                        print(f"Sync of account {name} failed:")
+                        traceback.print_exception(type(e), e, e.__traceback__)
+
+                    next_sync[name] = self.accounts[name].scheduler.next_tick()
+
+    async def run_async(self):
+        """Runs syncs of every account forever, in one event loop
+
+        Like run, but every account's sync pipeline runs as a task in a single event loop (blocking
+        client calls still run in worker threads) rather than on the shared worker pool
+        """
+        await asyncio.gather(*(self._run_account(name) for name in self.accounts))
+
+    async def _run_account(self, name: str):
+        """Runs syncs of account forever, at the ticks of its scheduler
+
+        Parameters
+        ----------
+        name : str
+            account profile name
+        """
+        account = self.accounts[name]
+
+        while True:
+            try:
+                await account.sync_async()
+            except Exception:
+                print(f"Sync of account {name} failed:")
+                traceback.print_exc()
+
+            # sleep until next tick of account
+            await asyncio.sleep(max(0, account.scheduler.next_tick() - monotonic()))
@@ -0,0 +1,118 @@
+import collections
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from .todo import Task, Completed, Update
+
+
+def diff_course_tasks(todo_tasks: List[Task], canvas_tasks: List[Task]) -> Dict[Update, List[Any]]:
+    """Generates updates to make to todo tasks of a course to match canvas tasks
+
+    Indexes the todo tasks by (name, due date), name and due date once, so the diff is linear in
+    the number of tasks. Updates are keyed by kind:
+      ADD, MARK_COMPLETE, MARK_INCOMPLETE: list of canvas tasks
+      CHANGE_DUE_DATE, RENAME: list of (todo task, canvas task) pairs
+      REMOVE: list of todo tasks no longer in canvas
+
+    Parameters
+    ----------
+    todo_tasks : List[Task]
+        tasks of course from todo app
+    canvas_tasks : List[Task]
+        tasks of course from canvas
+
+    Returns
+    -------
+    Dict[Update, List[Any]]
+        updates to make to todo tasks, keyed by update kind
+    """
+    # init updates
+    updates = collections.defaultdict(list)
+
+    # index todo tasks (duplicate tasks are equal, so track matches by position)
+    by_key = collections.defaultdict(collections.deque)
+    by_name = collections.defaultdict(collections.deque)
+    by_due = collections.defaultdict(collections.deque)
+    for idx, todo_task in enumerate(todo_tasks):
+        by_key[todo_task.key].append(idx)
+        by_name[todo_task.name].append(idx)
+        if not todo_task.due_date is None:
+            by_due[todo_task.due_date].append(idx)
+
+    matched = set()
+    unmatched_canv_tasks = []
+
+    # match canvas tasks that exist in todo (several may share a key), and sync completed-ness
+    for canv_task in canvas_tasks:
+        idxs = by_key[canv_task.key]
+        idx = _first_unmatched(idxs, matched)
+
+        # among todo tasks sharing key, prefer one with the same completed-ness
+        if not idx is None and len(idxs) > 1:
+            idx = next(
+                (
+                    i for i in idxs
+                    if not i in matched and todo_tasks[i].completed == canv_task.completed
+                ),
+                idx
+            )
+
+        if idx is None:
+            unmatched_canv_tasks.append(canv_task)
+            continue
+
+        matched.add(idx)
+        todo_completed = todo_tasks[idx].completed
+
+        if canv_task.completed == Completed.COMPLETE and todo_completed != Completed.COMPLETE:
+            updates[Update.MARK_COMPLETE].append(canv_task)
+
+        elif canv_task.completed == Completed.INCOMPLETE and todo_completed == Completed.COMPLETE:
+            updates[Update.MARK_INCOMPLETE].append(canv_task)
+
+    # match remaining canvas tasks to todo tasks with the same name, but a different due date
+    unrenamed_canv_tasks = []
+    for canv_task in unmatched_canv_tasks:
+        if (idx := _first_unmatched(by_name[canv_task.name], matched)) is None:
+            unrenamed_canv_tasks.append(canv_task)
+        else:
+            matched.add(idx)
+            updates[Update.CHANGE_DUE_DATE].append((todo_tasks[idx], canv_task))
+
+    # match remaining canvas tasks to todo tasks with the same due date, but a different name
+    for canv_task in unrenamed_canv_tasks:
+        if (idx := _first_unmatched(by_due[canv_task.due_date], matched)) is None:
+            # task does not exist at all in todo
+            updates[Update.ADD].append(canv_task)
+        else:
+            matched.add(idx)
+            updates[Update.RENAME].append((todo_tasks[idx], canv_task))
+
+    # remove todo tasks that are no longer in canvas
+    updates[Update.REMOVE] = [
+        todo_task
+        for idx, todo_task in enumerate(todo_tasks)
+        if not idx in matched
+    ]
+
+    return updates
+
+
+def _first_unmatched(idxs: Deque[int], matched: Set[int]) -> Optional[int]:
+    """Returns first index not yet matched, dropping matched indices from front of candidates
+
+    Parameters
+    ----------
+    idxs : Deque[int]
+        candidate todo task indices
+    matched : Set[int]
+        already matched todo task indices
+
+    Returns
+    -------
+    Optional[int]
+        first unmatched index, or None if all are matched
+    """
+    while idxs and idxs[0] in matched:
+        idxs.popleft()
+
+    return idxs[0] if idxs else None
@@ -0,0 +1,228 @@
+import hmac
+import json
+import queue
+import threading
+import urllib.request
+from time import monotonic
+from typing import Any, Dict, Optional, Set
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# header carrying shared secret of receiver
+SECRET_HEADER = "X-Canvas-Todo-Secret"
+
+
+class EventReceiver:
+    """Local HTTP receiver of canvas assignment and submission events
+
+    Accepts POSTed JSON events, either canvas live events ({"metadata": {...}, "body": {...}}) or
+    flat webhook-style events ({"event_name": ..., "course_id": ..., "assignment_id": ...}), and
+    queues the ID of the course each event affects, for a targeted resync of that course
+    """
+    host: str
+    port: int
+    secret: Optional[str]
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, secret: Optional[str] = None):
+        """Initializes event receiver
+
+        Parameters
+        ----------
+        host : str
+            address to listen on [default: localhost only]
+        port : int
+            port to listen on
+        secret : Optional[str]
+            shared secret events must send in the X-Canvas-Todo-Secret header, not checked if None
+        """
+        self.host = host
+        self.port = port
+        self.secret = secret
+
+        self._course_ids = queue.Queue()
+        self._server = None
+
+    def start(self):
+        """Starts listening for events in a background thread
+        """
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                receiver._handle(self)
+
+            def log_message(self, *args: Any):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        """Stops listening for events
+        """
+        if not self._server is None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def wait(self, timeout: float, debounce: float = 1) -> Set[int]:
+        """Waits for events, returning IDs of affected courses
+
+        After the first event arrives, waits a further <debounce> seconds, so a burst of events
+        causes one resync
+
+        Parameters
+        ----------
+        timeout : float
+            maximum seconds to wait for first event
+        debounce : float
+            seconds to collect further events after first event
+
+        Returns
+        -------
+        Set[int]
+            IDs of affected courses, empty if no event arrived before timeout
+        """
+        try:
+            course_ids = {self._course_ids.get(timeout=max(timeout, 0))}
+        except queue.Empty:
+            return set()
+
+        # collect events of burst
+        deadline = monotonic() + debounce
+        while (remaining := deadline - monotonic()) > 0:
+            try:
+                course_ids.add(self._course_ids.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return course_ids
+
+    def _handle(self, request: BaseHTTPRequestHandler):
+        """Handles POSTed event
+
+        Parameters
+        ----------
+        request : BaseHTTPRequestHandler
+            request of event
+        """
+        # check shared secret
+        if not self.secret is None and not hmac.compare_digest(
+                request.headers.get(SECRET_HEADER, ""), self.secret
+        ):
+            request.send_response(403)
+            request.end_headers()
+            return
+
+        try:
+            length = int(request.headers.get("Content-Length", 0))
+            course_id = event_course_id(json.loads(request.rfile.read(length)))
+
+        except (ValueError, TypeError):
+            course_id = None
+
+        # reject events that don't name a course
+        if course_id is None:
+            request.send_response(400)
+            request.end_headers()
+            return
+
+        self._course_ids.put(course_id)
+        request.send_response(202)
+        request.end_headers()
+
+
+def event_course_id(event: Dict) -> Optional[int]:
+    """Returns ID of course affected by event
+
+    Parameters
+    ----------
+    event : Dict
+        canvas live event, or flat webhook-style event
+
+    Returns
+    -------
+    Optional[int]
+        course ID, or None if event doesn't name a course (or isn't a JSON object)
+    """
+    if not isinstance(event, dict):
+        return None
+
+    body = event.get("body", event)
+    metadata = event.get("metadata", {})
+
+    # live events give course as context of assignment/submission
+    for source in (body, metadata):
+        if not isinstance(source, dict):
+            continue
+
+        if not source.get("course_id") is None:
+            return _local_id(source["course_id"])
+        if source.get("context_type") == "Course" and not source.get("context_id") is None:
+            return _local_id(source["context_id"])
+
+    return None
+
+
+def _local_id(canvas_id: Any) -> int:
+    """Returns local ID of canvas ID
+
+    Live events give global IDs (shard ID * 10 ** 13 + local ID) as strings
+
+    Parameters
+    ----------
+    canvas_id : Any
+        canvas ID, as int or string
+
+    Returns
+    -------
+    int
+        local ID
+    """
+    return int(canvas_id) % 10 ** 13
+
+
+def send_event(
+        url: str,
+        course_id: int,
+        assignment_id: Optional[int] = None,
+        event_name: str = "assignment_updated",
+        secret: Optional[str] = None
+) -> int:
+    """Sends webhook-style event to receiver, standing in for canvas
+
+    Parameters
+    ----------
+    url : str
+        URL of receiver
+    course_id : int
+        ID of affected course
+    assignment_id : Optional[int]
+        ID of affected assignment
+    event_name : str
+        name of event (e.g. assignment_updated, submission_created)
+    secret : Optional[str]
+        shared secret of receiver
+
+    Returns
+    -------
+    int
+        HTTP status of response
+    """
+    event = {
+        "metadata": {"event_name": event_name},
+        "body": {"course_id": course_id, "assignment_id": assignment_id}
+    }
+
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(event).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    if not secret is None:
+        request.add_header(SECRET_HEADER, secret)
+
+    with urllib.request.urlopen(request) as response:
+        return response.status
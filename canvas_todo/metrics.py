@@ -0,0 +1,295 @@
+import os
+import re
+import json
+import threading
+import contextlib
+import collections
+from time import perf_counter, time
+from typing import ContextManager, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from canvasapi import Canvas
+
+from .utils import get_canvas_requester
+
+
+# metric key: (metric name, sorted label pairs)
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Metrics:
+    """Collects per-phase timings, HTTP request counts and bytes, and cache hit rates
+
+    Metrics are written after each cycle as a Prometheus text file and/or appended as one JSON line
+    per cycle
+    """
+    enabled = True
+    prometheus_path: Optional[str]
+    json_log_path: Optional[str]
+
+    def __init__(self, prometheus_path: Optional[str] = None, json_log_path: Optional[str] = None):
+        """Initializes metrics
+
+        Parameters
+        ----------
+        prometheus_path : Optional[str]
+            path to write Prometheus text file to after each cycle
+        json_log_path : Optional[str]
+            path to append JSON line to after each cycle
+        """
+        self.prometheus_path = prometheus_path
+        self.json_log_path = json_log_path
+
+        # counters accumulate across cycles, gauges and cycle values are per cycle
+        self._lock = threading.Lock()
+        self._counters = collections.defaultdict(float)
+        self._gauges = {}
+        self._cycle = collections.defaultdict(float)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Times phase of cycle
+
+        Parameters
+        ----------
+        name : str
+            name of phase
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.inc("canvas_todo_phase_seconds_total", perf_counter() - start, phase=name)
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """Increments counter
+
+        Parameters
+        ----------
+        name : str
+            metric name
+        value : float
+            amount to increment by
+        **labels : str
+            metric labels
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+            self._cycle[key] += value
+
+    def set(self, name: str, value: float, **labels: str):
+        """Sets gauge
+
+        Parameters
+        ----------
+        name : str
+            metric name
+        value : float
+            gauge value
+        **labels : str
+            metric labels
+        """
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe_response(self, client: str, response: requests.Response):
+        """Records HTTP request
+
+        Parameters
+        ----------
+        client : str
+            client that made request (canvas, keep)
+        response : requests.Response
+            response of request
+        """
+        endpoint = _endpoint(response.request.url if response.request else response.url)
+        self.inc("canvas_todo_http_requests_total", client=client, endpoint=endpoint)
+        self.inc(
+            "canvas_todo_http_bytes_total",
+            len(response.content or b""),
+            client=client,
+            endpoint=endpoint
+        )
+        self.inc(
+            "canvas_todo_http_seconds_total",
+            response.elapsed.total_seconds(),
+            client=client,
+            endpoint=endpoint
+        )
+
+    def observe_cache(self, cache: str, hits: int, misses: int):
+        """Records cumulative hit and miss counts of cache
+
+        Parameters
+        ----------
+        cache : str
+            name of cache
+        hits : int
+            number of hits since start
+        misses : int
+            number of misses since start
+        """
+        self.set("canvas_todo_cache_hits", hits, cache=cache)
+        self.set("canvas_todo_cache_misses", misses, cache=cache)
+        self.set("canvas_todo_cache_hit_ratio", hits / max(hits + misses, 1), cache=cache)
+
+    def instrument_canvas(self, canv: Canvas):
+        """Records every HTTP request made by canvas object
+
+        Parameters
+        ----------
+        canv : Canvas
+            canvas object to instrument
+        """
+        requester = get_canvas_requester(canv)
+        request = requester.request
+
+        def instrumented_request(*args, **kwargs):
+            response = request(*args, **kwargs)
+            self.observe_response("canvas", response)
+            return response
+
+        requester.request = instrumented_request
+
+    def instrument_keep(self, keep):
+        """Records every HTTP request made by google keep object
+
+        Parameters
+        ----------
+        keep : gkeepapi.Keep
+            google keep object to instrument
+        """
+        for api in (keep._keep_api, keep._reminders_api, keep._media_api):
+            api._session.hooks["response"].append(
+                lambda response, *args, **kwargs: self.observe_response("keep", response)
+            )
+
+    def end_cycle(self):
+        """Writes metrics of finished cycle, and resets per-cycle values
+        """
+        with self._lock:
+            self._counters[("canvas_todo_cycles_total", ())] += 1
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            cycle = dict(self._cycle)
+            self._cycle.clear()
+
+        if not self.prometheus_path is None:
+            # write to temp file then move, so scrapers never read a partial file
+            tmp_path = self.prometheus_path + ".tmp"
+            with open(tmp_path, "w") as prom_out:
+                prom_out.write(_to_prometheus(counters, "counter"))
+                prom_out.write(_to_prometheus(gauges, "gauge"))
+            os.replace(tmp_path, self.prometheus_path)
+
+        if not self.json_log_path is None:
+            with open(self.json_log_path, "a") as json_out:
+                json_out.write(json.dumps({
+                    "time": time(),
+                    "cycle": {_key_str(key): value for key, value in sorted(cycle.items())},
+                    "gauges": {_key_str(key): value for key, value in sorted(gauges.items())}
+                }) + "\n")
+
+
+class NullMetrics(Metrics):
+    """Disabled metrics, every method is a no-op
+    """
+    enabled = False
+
+    def __init__(self):
+        pass
+
+    def phase(self, name: str) -> ContextManager:
+        return _NULL_CONTEXT
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        pass
+
+    def set(self, name: str, value: float, **labels: str):
+        pass
+
+    def observe_response(self, client: str, response: requests.Response):
+        pass
+
+    def observe_cache(self, cache: str, hits: int, misses: int):
+        pass
+
+    def instrument_canvas(self, canv: Canvas):
+        pass
+
+    def instrument_keep(self, keep):
+        pass
+
+    def end_cycle(self):
+        pass
+
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def _endpoint(url: str) -> str:
+    """Returns endpoint label of URL, its path with IDs replaced
+
+    Parameters
+    ----------
+    url : str
+        request URL
+
+    Returns
+    -------
+    str
+        endpoint label, e.g. /api/v1/courses/:id/assignments
+    """
+    return re.sub(r"/\d+(?=/|$)", "/:id", urlparse(url).path)
+
+
+def _key_str(key: MetricKey) -> str:
+    """Returns Prometheus string of metric key
+
+    Parameters
+    ----------
+    key : MetricKey
+        metric name and labels
+
+    Returns
+    -------
+    str
+        metric string, e.g. name{label="value"}
+    """
+    name, labels = key
+    if len(labels) == 0:
+        return name
+
+    label_str = ",".join(
+        '{}="{}"'.format(label, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for label, value in labels
+    )
+    return f"{name}{{{label_str}}}"
+
+
+def _to_prometheus(values: Dict[MetricKey, float], metric_type: str) -> str:
+    """Formats metrics in Prometheus text exposition format
+
+    Parameters
+    ----------
+    values : Dict[MetricKey, float]
+        metric values
+    metric_type : str
+        Prometheus metric type (counter, gauge)
+
+    Returns
+    -------
+    str
+        Prometheus text
+    """
+    lines = []
+    typed = set()
+    for key, value in sorted(values.items()):
+        if not key[0] in typed:
+            typed.add(key[0])
+            lines.append(f"# TYPE {key[0]} {metric_type}")
+        lines.append(f"{_key_str(key)} {value}")
+
+    return "".join(line + "\n" for line in lines)
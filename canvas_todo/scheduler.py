@@ -0,0 +1,158 @@
+import math
+import random
+from datetime import datetime, timezone
+from time import monotonic, sleep
+from typing import Any, Dict, List, Optional
+
+from canvasapi.course import Course
+
+from .todo import Task, Completed, Update
+
+
+class Scheduler:
+    """Adaptive sync scheduler
+
+    Ticks at a fixed rate from the first sync, so cycle time does not add to the interval. The
+    interval shrinks as the nearest incomplete due date approaches, grows when nothing has changed
+    for several cycles, and is jittered so many instances do not hit canvas at once
+    """
+    update_rate: float
+    min_rate: float
+    max_rate: float
+    idle_cycles: int
+    backoff_factor: float
+    due_date_fraction: float
+    jitter: float
+
+    def __init__(
+            self,
+            update_rate: float,
+            min_rate: Optional[float] = None,
+            max_rate: Optional[float] = None,
+            idle_cycles: int = 3,
+            backoff_factor: float = 2,
+            due_date_fraction: float = 0.25,
+            jitter: float = 0.1
+    ):
+        """Initializes scheduler
+
+        Parameters
+        ----------
+        update_rate : float
+            base seconds between syncs
+        min_rate : Optional[float]
+            minimum seconds between syncs [default: update_rate / 6]
+        max_rate : Optional[float]
+            maximum seconds between syncs [default: 4 * update_rate]
+        idle_cycles : int
+            number of unchanged cycles before backing off
+        backoff_factor : float
+            factor interval grows by for each further unchanged cycle
+        due_date_fraction : float
+            interval is at most this fraction of the time until the nearest due date
+        jitter : float
+            maximum fraction interval is randomly shortened or lengthened by
+        """
+        self.update_rate = update_rate
+        self.min_rate = update_rate / 6 if min_rate is None else min_rate
+        self.max_rate = 4 * update_rate if max_rate is None else max_rate
+        self.idle_cycles = idle_cycles
+        self.backoff_factor = backoff_factor
+        self.due_date_fraction = due_date_fraction
+        self.jitter = jitter
+
+        self._unchanged = 0
+        self._nearest_due_date = None
+        self._tick = None
+
+    def record(
+            self,
+            canvas_tasks: Dict[Course, List[Task]],
+            update_dict: Dict[int, Dict[Update, List[Any]]]
+    ):
+        """Records result of a sync cycle
+
+        Parameters
+        ----------
+        canvas_tasks : Dict[Course, List[Task]]
+            tasks dictionary from canvas, keyed by Course object
+        update_dict : Dict[int, Dict[Update, List[Any]]]
+            update dictionary of cycle, keyed by course ID
+        """
+        # count consecutive cycles without updates
+        if any(
+                len(updates) > 0
+                for course_updates in update_dict.values()
+                for updates in course_updates.values()
+        ):
+            self._unchanged = 0
+        else:
+            self._unchanged += 1
+
+        # get nearest upcoming due date of incomplete tasks
+        now = datetime.now(timezone.utc)
+        self._nearest_due_date = min(
+            (
+                task.due_date
+                for course_tasks in canvas_tasks.values()
+                for task in course_tasks
+                if (
+                    not task.due_date is None and
+                    task.due_date > now and
+                    task.completed != Completed.COMPLETE
+                )
+            ),
+            default=None
+        )
+
+    def next_interval(self) -> float:
+        """Returns seconds until next sync
+
+        Returns
+        -------
+        float
+            seconds until next sync
+        """
+        interval = self.update_rate
+
+        # back off when nothing has changed for several cycles
+        if self._unchanged >= self.idle_cycles:
+            exponent = self._unchanged - self.idle_cycles + 1
+
+            # stop growing once past max rate, so long idle periods can't overflow the power
+            if self.backoff_factor > 1 and interval > 0:
+                exponent = min(
+                    exponent,
+                    math.ceil(math.log(max(self.max_rate / interval, 1), self.backoff_factor))
+                )
+
+            interval *= self.backoff_factor ** exponent
+
+        # poll more often as nearest due date approaches
+        if not self._nearest_due_date is None:
+            time_to_due = (self._nearest_due_date - datetime.now(timezone.utc)).total_seconds()
+            interval = min(interval, self.due_date_fraction * time_to_due)
+
+        # clamp and jitter
+        interval = min(max(interval, self.min_rate), self.max_rate)
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def next_tick(self) -> float:
+        """Advances to next tick and returns its time
+
+        Ticks are spaced from the previous tick rather than from the end of the sync, so cycle time
+        does not drift the schedule. If a sync overran the tick, the next tick is now
+
+        Returns
+        -------
+        float
+            monotonic time of next tick
+        """
+        now = monotonic()
+        self._tick = max((now if self._tick is None else self._tick) + self.next_interval(), now)
+        return self._tick
+
+    def wait(self):
+        """Sleeps until next tick
+        """
+        sleep(max(0, self.next_tick() - monotonic()))
@@ -1,4 +1,6 @@
+from .base import TodoBase
 from .gkeep import GKeep
+from .sqlite_todo import SqliteTodo
 from .task import Task
 from .completed import Completed
 from .update import Update
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
 
@@ -7,7 +8,13 @@ from .update import Update
 
 class TodoBase(ABC):
     """Todo base class
+
+    Backends read state with request_todo_state, and write updates in transactions: begin_post,
+    then post_course_state for each course, then flush to commit them in one batch
     """
+    notes_written: int
+    items_written: int
+
     @abstractmethod
     def request_todo_state(self, courses: Dict[int, Any]) -> Dict[int, List[Task]]:
         """Requests state from API and updates local todo state
@@ -24,10 +31,13 @@ class TodoBase(ABC):
         """
         pass
 
-    @abstractmethod
     def post_todo_state(self, update_dict: Dict[int, Dict[Update, Any]], courses: Dict[int, Any]):
         """Posts state to API to match with new changes
 
+        Applies updates of every course as one transaction: staged with post_course_state, then
+        committed together by flush. Number of notes and items written are kept in notes_written
+        and items_written
+
         Parameters
         ----------
         update_dict : Dict[int, Dict[Update, List[Any]]]
@@ -35,8 +45,77 @@ class TodoBase(ABC):
         courses : Dict[int, Any]
             courses dictionary (keyed by course ID)
         """
+        self.begin_post()
+
+        # stage updates of each course
+        for course, course_params in courses.items():
+            self.post_course_state(course, update_dict[course], course_params)
+
+        # commit updates
+        self.flush()
+
+    def begin_post(self):
+        """Starts a transaction of updates, resetting write counts
+        """
+        self.notes_written = 0
+        self.items_written = 0
+
+    @abstractmethod
+    def post_course_state(
+            self, course_id: int, course_updates: Dict[Update, List[Any]], course_params: Dict
+    ):
+        """Stages updates of one course, to be committed by flush
+
+        Parameters
+        ----------
+        course_id : int
+            course ID
+        course_updates : Dict[Update, List[Any]]
+            updates of course, keyed by update kind
+        course_params : Dict
+            course parameters (nickname, color)
+        """
+        pass
+
+    @abstractmethod
+    def flush(self):
+        """Commits updates staged since begin_post
+        """
         pass
 
+    async def request_todo_state_async(self, courses: Dict[int, Any]) -> Dict[int, List[Task]]:
+        """Requests state from API and updates local todo state, without blocking event loop
+
+        Runs request_todo_state in a worker thread, backends with async clients can override
+
+        Parameters
+        ----------
+        courses : Dict[int, Any]
+            courses dictionary (keyed by course ID)
+
+        Returns
+        -------
+        Dict[int, List[Task]]
+            todo dictionary (keyed by course ID)
+        """
+        return await asyncio.to_thread(self.request_todo_state, courses)
+
+    async def post_todo_state_async(
+            self, update_dict: Dict[int, Dict[Update, Any]], courses: Dict[int, Any]
+    ):
+        """Posts state to API to match with new changes, without blocking event loop
+
+        Runs post_todo_state in a worker thread, backends with async clients can override
+
+        Parameters
+        ----------
+        update_dict : Dict[int, Dict[Update, List[Any]]]
+            update dictionary (keyed by course ID)
+        courses : Dict[int, Any]
+            courses dictionary (keyed by course ID)
+        """
+        await asyncio.to_thread(self.post_todo_state, update_dict, courses)
+
     @property
     def todo_state(self):
         """Returns state of todo app
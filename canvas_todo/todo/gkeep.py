@@ -1,11 +1,15 @@
+import os
+import json
+import collections
+import traceback
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import keyring
 import gkeepapi
 
 from .base import TodoBase
-from .task import Task
+from .task import Task, parse_todo_str
 from .update import Update
 from .completed import Completed
 from ..utils import time_utils
@@ -16,98 +20,375 @@ class GKeep(TodoBase):
     """
     notes: Dict[str, List[Task]]
     conf: Dict
+    state_path: Optional[str]
+    notes_written: int
+    items_written: int
+    _note_index: Optional[Dict[str, gkeepapi.node.List]]
+    _item_index: Dict[str, Dict[str, List[gkeepapi.node.ListItem]]]
 
-    def __init__(self, gkeep_conf: Dict):
+    def __init__(self, gkeep_conf: Dict, state_path: Optional[str] = None):
         """Initialize google keep object
 
         Parameters
         ----------
         gkeep_conf : Dict
             google keep configuration
+        state_path : Optional[str]
+            path of keep state snapshot, restored at startup so the first sync is incremental
         """
         # set conf
         self.conf = gkeep_conf
+        self.state_path = state_path
 
-        # set up google keep object
+        # set up google keep object from snapshot (if any), and sync notes
+        state = self._load_state()
+        try:
+            self._resume(state)
+
+        # snapshot may be corrupt or too old for an incremental sync, so fall back to full sync
+        except Exception:
+            if state is None:
+                raise
+
+            print("Failed to sync from google keep snapshot, resyncing from scratch")
+            traceback.print_exc()
+            self._resume(None)
+
+        # snapshot synced state
+        self._save_state()
+
+        # init per-sync indices and write counts
+        self._invalidate_index()
+        self._skipped_syncs = 0
+        self.notes_written = 0
+        self.items_written = 0
+
+    def _resume(self, state: Optional[Dict]):
+        """Logs in to google keep, restoring state if supplied, and syncs notes
+
+        Parameters
+        ----------
+        state : Optional[Dict]
+            keep state, as dumped by gkeepapi
+        """
         self.keep = gkeepapi.Keep()
         self.keep.resume(
-            gkeep_conf["api_username"],
-            keyring.get_password("gkeep-key", gkeep_conf["api_username"])
+            self.conf["api_username"],
+            keyring.get_password("gkeep-key", self.conf["api_username"]),
+            state=state,
+            sync=False
         )
 
         # sync notes
         self.keep.sync()
 
-    def post_todo_state(self, update_dict: Dict[int, Dict[Update, Any]], courses: Dict[int, Any]):
-        """Posts state to API to match with new changes
+    def _load_state(self) -> Optional[Dict]:
+        """Loads keep state snapshot
+
+        Returns
+        -------
+        Optional[Dict]
+            keep state, or None if there is no usable snapshot
+        """
+        if self.state_path is None or not os.path.exists(self.state_path):
+            return None
+
+        try:
+            with open(self.state_path, "r") as state_in:
+                snapshot = json.load(state_in)
+
+        except (OSError, ValueError):
+            print(f"Ignoring corrupt google keep snapshot {self.state_path}")
+            return None
+
+        # ignore snapshots of other accounts
+        if (
+                not isinstance(snapshot, dict) or
+                snapshot.get("api_username") != self.conf["api_username"]
+        ):
+            return None
+
+        return snapshot.get("state")
+
+    def _save_state(self):
+        """Saves keep state snapshot
+        """
+        if self.state_path is None:
+            return
+
+        snapshot = {"api_username": self.conf["api_username"], "state": self.keep.dump()}
+
+        # write to temp file (readable by user only) then move, so snapshot is never partial
+        tmp_path = self.state_path + ".tmp"
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as out:
+            json.dump(snapshot, out)
+        os.replace(tmp_path, self.state_path)
+
+    def post_course_state(
+            self, course_id: int, course_updates: Dict[Update, List[Any]], course_params: Dict
+    ):
+        """Applies updates of one course to local keep state, synced with google keep by flush
 
         Parameters
         ----------
-        update_dict : Dict[int, Dict[Update, List[Any]]]
-            update dictionary (keyed by course ID)
-        courses : Dict[int, Any]
-            courses dictionary (keyed by course ID)
+        course_id : int
+            course ID
+        course_updates : Dict[Update, List[Any]]
+            updates of course, keyed by update kind
+        course_params : Dict
+            course parameters (nickname, color)
         """
-        # iterate over courses
-        for course, course_params in courses.items():
-            # add course todo list if doesn't already exist
-            if len(course_note_list := list(self.keep.find(course_params["nickname"]))) == 0:
-                course_note = self.keep.createList(course_params["nickname"])
-                course_note.color = course_params["color"]
+        note_changed = False
 
-            else:
-                course_note = course_note_list[0]
+        # canvas reports tasks without online submissions (and tasks checked off by hand) as
+        # incomplete, so only uncheck items if configured to
+        if not self.conf.get("uncheck_incomplete", False):
+            course_updates = collections.defaultdict(list, course_updates)
+            course_updates[Update.MARK_INCOMPLETE] = []
+
+        # add course todo list if doesn't already exist
+        if (course_note := self._find_note(course_params["nickname"])) is None:
+            course_note = self.keep.createList(course_params["nickname"])
+            course_note.color = gkeepapi.node.ColorValue(course_params["color"])
+            self._note_index[course_params["nickname"]] = course_note
+            note_changed = True
 
-            # ensure note is pinned/unpinned
+        # ensure note is pinned/unpinned
+        if course_note.pinned != self.conf["pin_notes"]:
             course_note.pinned = self.conf["pin_notes"]
+            note_changed = True
+
+        # skip notes without updates
+        n_updates = sum(len(updates) for updates in course_updates.values())
+        if n_updates == 0:
+            self.notes_written += note_changed
+            return
+
+        # add course tasks that are missing
+        self._add_items(course_note, course_updates[Update.ADD])
+
+        # mark newly completed tasks as complete
+        for task_to_complete in course_updates[Update.MARK_COMPLETE]:
+            self._find_item(course_note, task_to_complete, True).checked = True
 
-            # add course tasks that are missing
-            for task_to_add in update_dict[course][Update.ADD]:
-                course_note.add(
-                    task_to_add.todo_str(),
-                    task_to_add.completed == Completed.COMPLETE
-                )
-
-            # mark newly completed tasks as complete
-            for task_to_complete in update_dict[course][Update.MARK_COMPLETE]:
-                task_idx = [
-                    task.text
-                    for task in course_note.items
-                ].index(task_to_complete.todo_str())
-
-                course_note.items[task_idx].checked = True
-
-            # sort tasks by due date
-            course_note.sort_items(
-                key=self.key_func
+        # mark newly incomplete tasks as incomplete
+        for task_to_uncomplete in course_updates[Update.MARK_INCOMPLETE]:
+            self._find_item(course_note, task_to_uncomplete, False).checked = False
+
+        # update tasks with changed due dates or names (keeping checked state only if unknown, as
+        # the item may now stand for a different assignment, e.g. next week's quiz of same name)
+        for old_task, new_task in (
+                course_updates[Update.CHANGE_DUE_DATE] +
+                course_updates[Update.RENAME]
+        ):
+            item = self._pop_item(course_note, old_task)
+            item.text = new_task.todo_str()
+            self._items(course_note).setdefault(item.text, []).append(item)
+            item.checked = new_task.completed == Completed.COMPLETE or (
+                item.checked and new_task.completed == Completed.UNKNOWN
             )
 
+        # remove tasks no longer in canvas
+        for task_to_remove in course_updates[Update.REMOVE]:
+            self._pop_item(course_note, task_to_remove).delete()
+
+        # sort tasks by due date
+        self._sort_items(course_note)
+
+        self.notes_written += 1
+        self.items_written += n_updates
+
+    def flush(self):
+        """Syncs local keep state with google keep, if any note changed since begin_post
+
+        The sync is skipped if no note changed, though at most <max_skipped_syncs> times in a row,
+        so remote changes are still pulled
+        """
+        # skip sync if nothing changed, unless remote changes haven't been pulled for too long
+        if self.notes_written == 0 and self._skipped_syncs < self.conf.get("max_skipped_syncs", 4):
+            self._skipped_syncs += 1
+            return
+
         # sync updates to google drive
         self.keep.sync()
+        self._skipped_syncs = 0
+
+        # snapshot synced state
+        self._save_state()
+
+        # sync may pull remote changes, so rebuild indices on next use
+        self._invalidate_index()
+
+    def _invalidate_index(self):
+        """Clears per-sync indices of course notes and list items
+        """
+        self._note_index = None
+        self._item_index = {}
+
+    def _find_note(self, nickname: str) -> Optional[gkeepapi.node.List]:
+        """Returns course note with given nickname, using per-sync index of notes by title
 
+        Parameters
+        ----------
+        nickname : str
+            course nickname (note title)
+
+        Returns
+        -------
+        Optional[gkeepapi.node.List]
+            course note, or None if it doesn't exist
+        """
+        # index untrashed list notes by title, once per sync
+        if self._note_index is None:
+            self._note_index = {}
+            for note in self.keep.all():
+                if isinstance(note, gkeepapi.node.List) and not note.trashed:
+                    self._note_index.setdefault(note.title, note)
+
+        # fall back to full search for notes whose title only contains the nickname
+        if not nickname in self._note_index:
+            if (note := next(self.keep.find(nickname), None)) is None:
+                return None
+            self._note_index[nickname] = note
+
+        return self._note_index[nickname]
+
+    def _items(self, course_note: gkeepapi.node.List) -> Dict[str, List[gkeepapi.node.ListItem]]:
+        """Returns per-sync index of list items of course note by text
+
+        Parameters
+        ----------
+        course_note : gkeepapi.node.List
+            course note to index
+
+        Returns
+        -------
+        Dict[str, List[gkeepapi.node.ListItem]]
+            list items of course note, keyed by text (several tasks may share a name and due date)
+        """
+        if not course_note.id in self._item_index:
+            items = collections.defaultdict(list)
+            for item in course_note.items:
+                items[item.text].append(item)
+            self._item_index[course_note.id] = dict(items)
+
+        return self._item_index[course_note.id]
+
+    def _find_item(
+            self, course_note: gkeepapi.node.List, task: Task, checked: Optional[bool] = None
+    ) -> gkeepapi.node.ListItem:
+        """Returns list item of course note matching task
+
+        Parameters
+        ----------
+        course_note : gkeepapi.node.List
+            course note to search
+        task : Task
+            task to find list item for
+        checked : Optional[bool]
+            checked state item is about to be set to, so among items with the same text, one that
+            isn't already in that state is preferred
+
+        Returns
+        -------
+        gkeepapi.node.ListItem
+            list item matching task
+        """
+        items = self._items(course_note)[task.todo_str()]
+        return next((item for item in items if item.checked != checked), items[0])
+
+    def _pop_item(self, course_note: gkeepapi.node.List, task: Task) -> gkeepapi.node.ListItem:
+        """Removes list item matching task from index of course note
+
+        Parameters
+        ----------
+        course_note : gkeepapi.node.List
+            course note to search
+        task : Task
+            task to find list item for (an item with its checked state is preferred)
+
+        Returns
+        -------
+        gkeepapi.node.ListItem
+            list item matching task
+        """
+        item = self._find_item(course_note, task, task.completed != Completed.COMPLETE)
+
+        items = self._items(course_note)
+        items[item.text].remove(item)
+        if len(items[item.text]) == 0:
+            del items[item.text]
+
+        return item
+
+    def _add_items(self, course_note: gkeepapi.node.List, tasks: List[Task]):
+        """Adds list items for tasks to course note in one batch
+
+        Builds list items directly rather than with List.add, which re-sorts every existing item
+        for each added item. Items are ordered afterwards by sorting the note
+
+        Parameters
+        ----------
+        course_note : gkeepapi.node.List
+            course note to add to
+        tasks : List[Task]
+            tasks to add
+        """
+        if len(tasks) == 0:
+            return
+
+        items = self._items(course_note)
+        for task in tasks:
+            item = gkeepapi.node.ListItem(
+                parent_id=course_note.id, parent_server_id=course_note.server_id
+            )
+            item.checked = task.completed == Completed.COMPLETE
+            item.text = task.todo_str()
+            course_note.append(item, True)
+            items.setdefault(item.text, []).append(item)
+
+        course_note.touch(True)
+
+    def _sort_items(self, course_note: gkeepapi.node.List):
+        """Sorts list items of course note by due date, unless already in order
+
+        Parameters
+        ----------
+        course_note : gkeepapi.node.List
+            course note to sort
+        """
+        keys = [self.key_func(item) for item in course_note.items]
+
+        # skip sort (and re-upload of sort values) if already ordered
+        if all(prev_key <= key for prev_key, key in zip(keys, keys[1:])):
+            return
+
+        course_note.sort_items(
+            key=self.key_func
+        )
 
     @staticmethod
-    def key_func(task_str: str) -> datetime:
-        """Returns datetime object given task string
+    def key_func(keep_task: gkeepapi.node.ListItem) -> datetime:
+        """Returns datetime object given google keep task
 
         Parameters
         ----------
-        task_str : str
-            task string to generate key from
+        keep_task : gkeepapi.node.ListItem
+            google keep task to generate key from
 
         Returns
         -------
         datetime
-            datetime object generated from task string
+            datetime object generated from task text
         """
-        task = Task.from_gkeep_task(task_str)
+        _, due_date = parse_todo_str(keep_task.text)
 
         # return max time if due date doesn't exist (goes to end of list)
-        if task.due_date is None:
+        if due_date is None:
             return time_utils.max_time()
 
         else:
-            return task.due_date
+            return due_date
 
     def request_todo_state(self, courses: Dict[int, Any]) -> Dict[int, List[Task]]:
         """Requests and returns todo state from Google Keep API
@@ -127,13 +408,11 @@ class GKeep(TodoBase):
 
         # build tasks list for each course
         for course, course_params in courses.items():
-            course_todo_list = list(self.keep.find(course_params["nickname"]))
-
             # if course list already exists
-            if len(course_todo_list) > 0:
+            if not (course_note := self._find_note(course_params["nickname"])) is None:
                 todo_dict[course] = [
                     Task.from_gkeep_task(keep_task)
-                    for keep_task in course_todo_list[0].items
+                    for keep_task in course_note.items
                 ]
 
             # if the course list doesn't exist, create one
@@ -0,0 +1,266 @@
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import TodoBase
+from .task import Task
+from .update import Update
+from .completed import Completed
+from ..utils import time_utils
+
+
+# selects ID of one item with given course, name and due date, preferring items whose checked
+# state differs from the given one
+FIND_ITEM_SQL = (
+    "SELECT id FROM items WHERE course_id = ? AND name = ? AND due_date = ? "
+    "ORDER BY checked = ? LIMIT 1"
+)
+
+
+class SqliteTodo(TodoBase):
+    """Local todo list stored in a sqlite database
+
+    Each course with tasks is a row of the notes table, and each task a row of the items table
+    (several tasks may share a name and due date, so items are identified by their own ID). Updates
+    staged by post_course_state are written in a single transaction by flush
+    """
+    conn: sqlite3.Connection
+    notes_written: int
+    items_written: int
+    _pending: List[Tuple[str, List[Tuple]]]
+
+    def __init__(self, path: str):
+        """Initializes sqlite todo list
+
+        Parameters
+        ----------
+        path : str
+            path to sqlite database file
+        """
+        # connection is used from sync worker threads, so guard with lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+
+        # create tables if they don't exist
+        with self._lock, self.conn:
+            # items of older versions were keyed by name and due date, so give them IDs
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(items)")]
+            if len(columns) > 0 and not "id" in columns:
+                self.conn.execute("ALTER TABLE items RENAME TO items_old")
+
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS notes (
+                    course_id INTEGER PRIMARY KEY,
+                    nickname TEXT,
+                    color TEXT
+                );
+                CREATE TABLE IF NOT EXISTS items (
+                    id INTEGER PRIMARY KEY,
+                    course_id INTEGER,
+                    name TEXT,
+                    due_date TEXT NOT NULL,
+                    checked INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS items_key ON items (course_id, name, due_date);
+                """
+            )
+
+            if len(columns) > 0 and not "id" in columns:
+                self.conn.execute(
+                    "INSERT INTO items (course_id, name, due_date, checked) "
+                    "SELECT course_id, name, due_date, checked FROM items_old"
+                )
+                self.conn.execute("DROP TABLE items_old")
+
+        # init staged statements and write counts
+        self._pending = []
+        self.notes_written = 0
+        self.items_written = 0
+
+    def request_todo_state(self, courses: Dict[int, Any]) -> Dict[int, List[Task]]:
+        """Reads todo state from database
+
+        Parameters
+        ----------
+        courses : Dict[int, Any]
+            courses dictionary (keyed by course ID)
+
+        Returns
+        -------
+        Dict[int, List[Task]]
+            todo dictionary (keyed by course ID)
+        """
+        # init todo dictionary
+        todo_dict = {course: [] for course in courses}
+
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT course_id, name, due_date, checked FROM items"
+            ).fetchall()
+
+        # build tasks list for each course
+        for course_id, name, due_date, checked in rows:
+            if course_id in todo_dict:
+                todo_dict[course_id].append(
+                    Task(
+                        name,
+                        _from_db_date(due_date),
+                        Completed.COMPLETE if checked else Completed.INCOMPLETE
+                    )
+                )
+
+        return todo_dict
+
+    def begin_post(self):
+        """Starts a transaction of updates, dropping any uncommitted updates
+        """
+        super().begin_post()
+        self._pending = []
+
+    def post_course_state(
+            self, course_id: int, course_updates: Dict[Update, List[Any]], course_params: Dict
+    ):
+        """Stages updates of one course, to be written by flush
+
+        Parameters
+        ----------
+        course_id : int
+            course ID
+        course_updates : Dict[Update, List[Any]]
+            updates of course, keyed by update kind
+        course_params : Dict
+            course parameters (nickname, color)
+        """
+        # skip notes without updates
+        n_updates = sum(len(updates) for updates in course_updates.values())
+        if n_updates == 0:
+            return
+
+        # add or update course note
+        self._pending.append((
+            "INSERT OR REPLACE INTO notes VALUES (?, ?, ?)",
+            [(
+                course_id,
+                course_params["nickname"],
+                getattr(course_params["color"], "value", course_params["color"])
+            )]
+        ))
+
+        # add course tasks that are missing
+        self._pending.append((
+            "INSERT INTO items (course_id, name, due_date, checked) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    course_id,
+                    task.name,
+                    _to_db_date(task.due_date),
+                    task.completed == Completed.COMPLETE
+                )
+                for task in course_updates[Update.ADD]
+            ]
+        ))
+
+        # mark newly completed and incomplete tasks, one item each (preferring one not already in
+        # that state, among items with the same name and due date)
+        self._pending.append((
+            f"UPDATE items SET checked = ? WHERE id = ({FIND_ITEM_SQL})",
+            [
+                (checked, course_id, task.name, _to_db_date(task.due_date), checked)
+                for checked, update in (
+                    (True, Update.MARK_COMPLETE),
+                    (False, Update.MARK_INCOMPLETE)
+                )
+                for task in course_updates[update]
+            ]
+        ))
+
+        # update tasks with changed due dates or names (keeping checked state if unknown)
+        self._pending.append((
+            "UPDATE items SET name = ?, due_date = ?, checked = COALESCE(?, checked) "
+            f"WHERE id = ({FIND_ITEM_SQL})",
+            [
+                (
+                    new_task.name,
+                    _to_db_date(new_task.due_date),
+                    (
+                        None if new_task.completed == Completed.UNKNOWN else
+                        new_task.completed == Completed.COMPLETE
+                    ),
+                    course_id,
+                    old_task.name,
+                    _to_db_date(old_task.due_date),
+                    old_task.completed != Completed.COMPLETE
+                )
+                for old_task, new_task in (
+                    course_updates[Update.CHANGE_DUE_DATE] +
+                    course_updates[Update.RENAME]
+                )
+            ]
+        ))
+
+        # remove tasks no longer in canvas
+        self._pending.append((
+            f"DELETE FROM items WHERE id = ({FIND_ITEM_SQL})",
+            [
+                (
+                    course_id,
+                    task.name,
+                    _to_db_date(task.due_date),
+                    task.completed != Completed.COMPLETE
+                )
+                for task in course_updates[Update.REMOVE]
+            ]
+        ))
+
+        self.notes_written += 1
+        self.items_written += n_updates
+
+    def flush(self):
+        """Writes staged updates in one transaction, skipped if nothing is staged
+        """
+        if len(self._pending) == 0:
+            return
+
+        with self._lock, self.conn:
+            for statement, rows in self._pending:
+                if len(rows) > 0:
+                    self.conn.executemany(statement, rows)
+
+        self._pending = []
+
+
+def _to_db_date(due_date: Optional[datetime]) -> str:
+    """Converts due date to ISO8601 string stored in database
+
+    Parameters
+    ----------
+    due_date : Optional[datetime]
+        due date of task
+
+    Returns
+    -------
+    str
+        ISO8601 due date, empty if task has no due date (as NULLs can't be part of a key)
+    """
+    return "" if due_date is None else due_date.astimezone(time_utils.UTC_TZ).isoformat()
+
+
+def _from_db_date(due_date: str) -> Optional[datetime]:
+    """Converts ISO8601 string stored in database to due date
+
+    Parameters
+    ----------
+    due_date : str
+        ISO8601 due date, empty if task has no due date
+
+    Returns
+    -------
+    Optional[datetime]
+        due date in local timezone, None if task has no due date
+    """
+    if due_date == "":
+        return None
+
+    return datetime.fromisoformat(due_date).astimezone(time_utils.LOCAL_TZ)
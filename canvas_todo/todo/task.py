@@ -1,6 +1,8 @@
 import re
+import functools
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional, Set, Tuple
 
 from gkeepapi.node import ListItem
 from canvasapi.assignment import Assignment
@@ -10,13 +12,88 @@ from ..utils import time_utils
 from .completed import Completed
 
 
-@dataclass
+# maximum number of parsed todo strings to keep
+PARSE_CACHE_SIZE = 4096
+
+TODO_STR_RE = re.compile(r"^(.*) \((.*)\)$")
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_todo_str(todo_str: str) -> Tuple[str, Optional[datetime]]:
+    """Parses todo string into task name and due date, caching recently parsed strings
+
+    Parameters
+    ----------
+    todo_str : str
+        todo string, as generated by Task.todo_str
+
+    Returns
+    -------
+    Tuple[str, Optional[datetime]]
+        task name and due date
+    """
+    name, date_str = TODO_STR_RE.match(todo_str).groups()
+
+    return name, time_utils.from_due_date_str(date_str)
+
+
+@dataclass(frozen=True)
 class Task:
-    """Task data class"""
+    """Task data class
+
+    Tasks are immutable and hashable. The sort key is computed on construction, and the todo string
+    on first use
+    """
+    __slots__ = ("name", "due_date", "completed", "sort_key", "_todo_str")
+
     name: str
     due_date: datetime
     completed: Completed
 
+    def __post_init__(self):
+        """Precomputes derived keys of task
+        """
+        # sort key, tasks without due dates go to end of list
+        object.__setattr__(
+            self, "sort_key", time_utils.max_time() if self.due_date is None else self.due_date
+        )
+
+        object.__setattr__(self, "_todo_str", None)
+
+    def __getstate__(self) -> Tuple[str, Optional[datetime], Completed]:
+        """Returns state of task, for copy and pickle
+
+        Returns
+        -------
+        Tuple[str, Optional[datetime], Completed]
+            task name, due date and completed-ness (derived keys are recomputed on restore)
+        """
+        return self.name, self.due_date, self.completed
+
+    def __setstate__(self, state: Tuple[str, Optional[datetime], Completed]):
+        """Restores state of task, for copy and pickle (bypassing frozen attribute assignment)
+
+        Parameters
+        ----------
+        state : Tuple[str, Optional[datetime], Completed]
+            task name, due date and completed-ness
+        """
+        for field, value in zip(("name", "due_date", "completed"), state):
+            object.__setattr__(self, field, value)
+
+        self.__post_init__()
+
+    @property
+    def key(self) -> Tuple[str, Optional[datetime]]:
+        """Returns identity key of task, matching the same task regardless of completed-ness
+
+        Returns
+        -------
+        Tuple[str, Optional[datetime]]
+            task name and due date
+        """
+        return self.name, self.due_date
+
     @staticmethod
     def from_gkeep_task(keep_task: ListItem):
         """Builds task from google keep task
@@ -32,17 +109,19 @@ class Task:
             task data object built from google keep task
         """
         # parse task text
-        name, date_str = re.match(r"^(.*) \((.*)\)$", keep_task.text).groups()
+        name, due_date = parse_todo_str(keep_task.text)
 
         # build task object
         return Task(
             name,
-            time_utils.from_due_date_str(date_str),
+            due_date,
             Completed.COMPLETE if keep_task.checked else Completed.INCOMPLETE
         )
 
     @staticmethod
-    def from_canvas_assmnt(canvas_assmnt: Assignment, user: User):
+    def from_canvas_assmnt(
+            canvas_assmnt: Assignment, user: User, submitted_ids: Optional[Set[int]] = None
+    ):
         """Builds task from canvas assignment
 
         Parameters
@@ -51,6 +130,8 @@ class Task:
             canvas assignment to build Task from
         user : User
             user to use to get completed-ness
+        submitted_ids : Optional[Set[int]]
+            prefetched IDs of submitted assignments, if None requests submission for assignment
 
         Returns
         -------
@@ -60,6 +141,10 @@ class Task:
         # get completedness of assignment
         if canvas_assmnt.submission_types == ['none']:
             completed = Completed.UNKNOWN
+        elif not submitted_ids is None:
+            completed = (
+                Completed.COMPLETE if canvas_assmnt.id in submitted_ids else Completed.INCOMPLETE
+            )
         elif not canvas_assmnt.get_submission(user).submitted_at is None:
             completed = Completed.COMPLETE
         else:
@@ -90,5 +175,10 @@ class Task:
         str
             string repr of task
         """
-        # return formatted assignment string
-        return f"{self.name} ({time_utils.to_due_date_str(self.due_date)})"
+        # format assignment string on first use
+        if self._todo_str is None:
+            object.__setattr__(
+                self, "_todo_str", f"{self.name} ({time_utils.to_due_date_str(self.due_date)})"
+            )
+
+        return self._todo_str
@@ -6,3 +6,7 @@ class Update(Enum):
     """
     ADD = 0
     MARK_COMPLETE = 1
+    MARK_INCOMPLETE = 2
+    CHANGE_DUE_DATE = 3
+    RENAME = 4
+    REMOVE = 5
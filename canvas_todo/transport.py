@@ -0,0 +1,306 @@
+import random
+import threading
+from time import monotonic, sleep
+from typing import Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# methods that are safe to resend after a server error or dropped connection
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# server errors worth retrying
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Bounds concurrent requests of one canvas access token, adapting to its rate limit budget
+
+    Canvas throttles each token by a leaky bucket of request cost, reporting what is left of it in
+    X-Rate-Limit-Remaining. The concurrency limit grows by one per response while the budget is
+    above the low water mark, halves when it drops below it, and falls to one when a request is
+    throttled. Below the low water mark, requests are also spaced out so the bucket can refill
+    """
+    max_concurrency: int
+    low_water: float
+    refill_rate: float
+    limit: int
+    remaining: Optional[float]
+
+    def __init__(self, max_concurrency: int = 8, low_water: float = 100, refill_rate: float = 10):
+        """Initializes rate limiter
+
+        Parameters
+        ----------
+        max_concurrency : int
+            maximum number of concurrent requests
+        low_water : float
+            remaining budget below which concurrency is reduced
+        refill_rate : float
+            approximate budget units canvas restores per second
+        """
+        self.max_concurrency = max_concurrency
+        self.low_water = low_water
+        self.refill_rate = refill_rate
+        self.limit = max_concurrency
+        self.remaining = None
+
+        self._in_flight = 0
+        self._not_before = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Waits until a request may be sent
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+            delay = self._not_before - monotonic()
+
+        # wait for bucket to refill, outside of lock so responses can still be recorded
+        if delay > 0:
+            sleep(delay)
+
+    def release(self, remaining: Optional[float], throttled: bool):
+        """Records response of request and frees its slot
+
+        Parameters
+        ----------
+        remaining : Optional[float]
+            remaining rate limit budget reported by canvas, None if not reported
+        throttled : bool
+            true if request was throttled
+        """
+        with self._cond:
+            self._in_flight -= 1
+
+            if throttled:
+                self.limit = 1
+                self._not_before = monotonic() + self.low_water / self.refill_rate
+
+            elif not remaining is None:
+                self.remaining = remaining
+
+                # back off while budget is low, holding requests until it refills to low water
+                if remaining < self.low_water:
+                    self.limit = max(1, self.limit // 2)
+                    self._not_before = monotonic() + (self.low_water - remaining) / self.refill_rate
+
+                # otherwise probe for more throughput
+                elif self.limit < self.max_concurrency:
+                    self.limit += 1
+
+            self._cond.notify_all()
+
+
+class CanvasSession(requests.Session):
+    """HTTP session for canvas, tracking rate limit budget and retrying failed requests
+
+    Requests of each access token go through their own RateLimiter, so one session can be shared by
+    accounts on the same host. Throttled requests (403 Rate Limit Exceeded, 429) are always retried,
+    server errors and dropped connections only for idempotent methods, each after a jittered
+    exponential backoff (or the server's Retry-After). Connections are kept alive in a pool sized to
+    the concurrency limit of every account sharing the session
+    """
+    max_concurrency: int
+    max_retries: int
+    backoff_base: float
+    backoff_max: float
+    low_water: float
+    refill_rate: float
+    n_accounts: int
+    retries: int
+    throttled: int
+
+    def __init__(
+            self,
+            max_concurrency: int = 8,
+            max_retries: int = 5,
+            backoff_base: float = 0.5,
+            backoff_max: float = 30,
+            low_water: float = 100,
+            refill_rate: float = 10,
+            n_accounts: int = 1
+    ):
+        """Initializes canvas session
+
+        Parameters
+        ----------
+        max_concurrency : int
+            maximum number of concurrent requests per access token
+        max_retries : int
+            maximum number of times a request is retried
+        backoff_base : float
+            seconds of first backoff, doubled for each further retry
+        backoff_max : float
+            maximum seconds of backoff
+        low_water : float
+            remaining rate limit budget below which concurrency is reduced
+        refill_rate : float
+            approximate rate limit budget units canvas restores per second
+        n_accounts : int
+            number of accounts (access tokens) sharing session
+        """
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.low_water = low_water
+        self.refill_rate = refill_rate
+        self.n_accounts = n_accounts
+
+        # retry counts, for metrics
+        self.retries = 0
+        self.throttled = 0
+
+        # keep a pooled connection alive per concurrent request of every account
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency * max(n_accounts, 1))
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+
+    def request(self, method: str, url: str, *args, **kwargs) -> requests.Response:
+        """Sends request within rate limit budget of its access token, retrying if it fails
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+        url : str
+            request URL
+        *args, **kwargs
+            passed to requests.Session.request
+
+        Returns
+        -------
+        requests.Response
+            response to last attempt
+        """
+        limiter = self.limiter(kwargs.get("headers"))
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            limiter.acquire()
+            response = None
+            try:
+                response = super().request(method, url, *args, **kwargs)
+
+            # retry dropped connections of idempotent requests
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+
+            finally:
+                throttled = _is_throttled(response)
+                limiter.release(_remaining(response), throttled)
+
+            if throttled:
+                self.throttled += 1
+
+            # return response unless it should be retried
+            if not response is None and (
+                    attempt >= self.max_retries or
+                    not (
+                        throttled or
+                        (idempotent and response.status_code in RETRY_STATUS_CODES)
+                    )
+            ):
+                return response
+
+            sleep(self.backoff(attempt, response))
+            attempt += 1
+            self.retries += 1
+
+    def limiter(self, headers: Optional[Mapping[str, str]]) -> RateLimiter:
+        """Returns rate limiter of access token request is authorized with
+
+        Parameters
+        ----------
+        headers : Optional[Mapping[str, str]]
+            request headers
+
+        Returns
+        -------
+        RateLimiter
+            rate limiter of access token
+        """
+        token = None if headers is None else headers.get("Authorization")
+
+        with self._limiters_lock:
+            if not token in self._limiters:
+                self._limiters[token] = RateLimiter(
+                    self.max_concurrency, self.low_water, self.refill_rate
+                )
+
+            return self._limiters[token]
+
+    def backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Returns seconds to wait before retrying
+
+        Parameters
+        ----------
+        attempt : int
+            number of retries so far
+        response : Optional[requests.Response]
+            response of failed attempt, None if connection failed
+
+        Returns
+        -------
+        float
+            seconds to wait
+        """
+        # honor server's requested delay
+        if not response is None and not (retry_after := response.headers.get("Retry-After")) is None:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+
+        # full jitter exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def _remaining(response: Optional[requests.Response]) -> Optional[float]:
+    """Returns remaining rate limit budget reported in response
+
+    Parameters
+    ----------
+    response : Optional[requests.Response]
+        canvas response
+
+    Returns
+    -------
+    Optional[float]
+        remaining budget, None if not reported
+    """
+    if response is None:
+        return None
+
+    try:
+        return float(response.headers["X-Rate-Limit-Remaining"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _is_throttled(response: Optional[requests.Response]) -> bool:
+    """Returns true if canvas throttled request
+
+    Parameters
+    ----------
+    response : Optional[requests.Response]
+        canvas response
+
+    Returns
+    -------
+    bool
+        true if request was throttled
+    """
+    return not response is None and (
+        response.status_code == 429 or
+        (response.status_code == 403 and "Rate Limit Exceeded" in response.text)
+    )
@@ -1 +1,3 @@
 from .course_utils import get_courses_from_ids
+from .session_utils import get_canvas_requester, get_canvas_session, set_canvas_session
+from .loop_utils import get_shared_loop, run_shared
@@ -1,26 +1,110 @@
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from canvasapi import Canvas
 from canvasapi.course import Course
+from canvasapi.exceptions import CanvasException
 
+from .session_utils import get_canvas_requester
 
-def get_courses_from_ids(canv: Canvas, ids: List[int]) -> List[Course]:
+# cache package imports todo tasks, which import utils, so only import for type checking
+if TYPE_CHECKING:
+    from ..cache import CourseCache, SharedCourseCache
+
+
+def get_courses_from_ids(
+        canv: Canvas,
+        ids: List[int],
+        cache: Optional["CourseCache"] = None,
+        max_workers: int = 4,
+        shared_cache: Optional["SharedCourseCache"] = None
+) -> List[Course]:
     """Gets canvas courses from canvas object, list of ids
 
+    Each course is requested directly by ID, in parallel, rather than listing every course the user
+    was ever enrolled in. If a cache is supplied, courses cached within its max age aren't requested
+    at all. Courses that can't be fetched (deleted, or no longer accessible) are skipped
+
     Parameters
     ----------
     canv : Canvas
         canvas object to get course from
     ids : List[int]
         list of course IDs
+    cache : Optional[CourseCache]
+        persistent course metadata cache
+    max_workers : int
+        maximum number of concurrent course requests
+    shared_cache : Optional[SharedCourseCache]
+        cache of course metadata shared with other accounts, fetched per account if None
 
     Returns
     -------
     List[Course]
-        list of course objects matching the course IDs
+        list of course objects matching the course IDs, in order of IDs
     """
+    ids = list(ids)
+
+    # get attributes of cached courses
+    attributes = {} if cache is None else cache.get_courses(ids)
+
+    def fetch_course(course_id: int) -> Optional[Dict]:
+        if shared_cache is None:
+            return _fetch_course(canv, course_id)
+
+        return shared_cache.get_or_fetch(
+            ("course", course_id), lambda: _fetch_course(canv, course_id)
+        )
+
+    # fetch remaining courses in parallel
+    missing = [course_id for course_id in ids if not course_id in attributes]
+    if len(missing) > 0:
+        with ThreadPoolExecutor(max_workers=max(min(max_workers, len(missing)), 1)) as executor:
+            fetched = dict(zip(missing, executor.map(fetch_course, missing)))
+
+        for course_id, course_attributes in fetched.items():
+            if course_attributes is None:
+                continue
+
+            attributes[course_id] = course_attributes
+            if not cache is None:
+                cache.put_course(course_id, course_attributes)
+
+    # build course objects from attributes
+    requester = get_canvas_requester(canv)
     return [
-        course
-        for course in canv.get_courses()
-        if course.id in ids
+        Course(requester, attributes[course_id])
+        for course_id in ids
+        if course_id in attributes
     ]
+
+
+def _fetch_course(canv: Canvas, course_id: int) -> Optional[Dict]:
+    """Fetches attributes of course
+
+    Parameters
+    ----------
+    canv : Canvas
+        canvas object to get course from
+    course_id : int
+        course ID
+
+    Returns
+    -------
+    Optional[Dict]
+        course attributes as returned by canvas, or None if course can't be fetched
+    """
+    try:
+        course = canv.get_course(course_id)
+
+    except CanvasException as exc:
+        print(f"Skipping course {course_id}: {exc}")
+        return None
+
+    # drop requester and datetime attributes canvasapi derives from date strings
+    return {
+        key: value
+        for key, value in vars(course).items()
+        if key != "_requester" and not isinstance(value, datetime)
+    }
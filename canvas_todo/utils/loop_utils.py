@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+
+# event loop shared by syncs of every account, run in a background thread
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_shared_loop() -> asyncio.AbstractEventLoop:
+    """Returns event loop shared by every account of the process, starting it on first use
+
+    Running every account's sync on one loop shares its default executor, so idle worker threads of
+    to_thread calls aren't kept per account
+
+    Returns
+    -------
+    asyncio.AbstractEventLoop
+        shared event loop, running in a daemon thread
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="canvas-todo-loop", daemon=True).start()
+
+        return _loop
+
+
+def run_shared(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Runs coroutine on shared event loop, blocking until it finishes
+
+    Must not be called from the shared loop itself
+
+    Parameters
+    ----------
+    coro : Coroutine[Any, Any, Any]
+        coroutine to run
+
+    Returns
+    -------
+    Any
+        result of coroutine
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_shared_loop())
+    try:
+        return future.result()
+
+    # cancel coroutine if caller is interrupted, rather than leave it running
+    except BaseException:
+        future.cancel()
+        raise
@@ -0,0 +1,52 @@
+import requests
+from canvasapi import Canvas
+from canvasapi.requester import Requester
+
+
+def get_canvas_requester(canv: Canvas) -> Requester:
+    """Returns requester used by canvas object
+
+    Parameters
+    ----------
+    canv : Canvas
+        canvas object
+
+    Returns
+    -------
+    Requester
+        requester canvas requests are made by
+    """
+    # canvasapi keeps its requester private
+    return canv._Canvas__requester
+
+
+def get_canvas_session(canv: Canvas) -> requests.Session:
+    """Returns HTTP session used by canvas object
+
+    Parameters
+    ----------
+    canv : Canvas
+        canvas object
+
+    Returns
+    -------
+    requests.Session
+        session canvas requests are sent through
+    """
+    return get_canvas_requester(canv)._session
+
+
+def set_canvas_session(canv: Canvas, session: requests.Session):
+    """Sets HTTP session used by canvas object
+
+    Canvas authenticates with a header added to each request, so one session (and its connection
+    pool) can be shared by canvas objects of different accounts on the same host
+
+    Parameters
+    ----------
+    canv : Canvas
+        canvas object
+    session : requests.Session
+        session to send canvas requests through
+    """
+    get_canvas_requester(canv)._session = session
@@ -1,3 +1,4 @@
+import functools
 from datetime import datetime
 from dateutil import tz
 
@@ -5,6 +6,15 @@ from dateutil import tz
 DUE_DATE_FORMAT = "%m/%d/%Y @ %I:%M%p"
 ISO8601_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
 
+# maximum number of parsed date strings to keep
+PARSE_CACHE_SIZE = 4096
+
+# timezones are constructed once, tzlocal is slow to build
+UTC_TZ = tz.tzutc()
+LOCAL_TZ = tz.tzlocal()
+
+MAX_TIME = datetime.max.replace(tzinfo=UTC_TZ)
+
 
 def gen_due_date_str(date_str: str) -> str:
     """Converts ISO8601 string to formatted due date string
@@ -22,6 +32,7 @@ def gen_due_date_str(date_str: str) -> str:
     return from_iso8601(date_str).strftime(DUE_DATE_FORMAT)
 
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def from_due_date_str(date_str: str) -> datetime:
     """Converts formatted due date string to datetime object
 
@@ -35,15 +46,44 @@ def from_due_date_str(date_str: str) -> datetime:
     datetime
         datetime object, created from date string
     """
+    if date_str == "no due date":
+        return None
+
     try:
+        return _parse_due_date_str(date_str).astimezone(LOCAL_TZ)
+    except ValueError:
         return datetime.strptime(
             date_str, DUE_DATE_FORMAT
-        ).astimezone(tz.tzlocal()).replace(second=0)
-    except ValueError as e:
-        if date_str == "no due date":
-            return None
-        else:
-            raise e
+        ).astimezone(LOCAL_TZ).replace(second=0)
+
+
+def _parse_due_date_str(date_str: str) -> datetime:
+    """Parses due date string in fixed "MM/DD/YYYY @ HH:MMAM" layout without strptime
+
+    Parameters
+    ----------
+    date_str : str
+        formatted datetime string
+
+    Returns
+    -------
+    datetime
+        naive datetime object
+
+    Raises
+    ------
+    ValueError
+        if date string is not in expected layout
+    """
+    if len(date_str) != 20 or date_str[10:13] != " @ " or not date_str[18:] in ("AM", "PM"):
+        raise ValueError(f"unexpected due date string: {date_str}")
+
+    # convert 12-hour clock to 24-hour clock
+    hour = int(date_str[13:15]) % 12 + (12 if date_str[18:] == "PM" else 0)
+
+    return datetime(
+        int(date_str[6:10]), int(date_str[0:2]), int(date_str[3:5]), hour, int(date_str[16:18])
+    )
 
 
 def to_due_date_str(dt: datetime) -> str:
@@ -65,6 +105,7 @@ def to_due_date_str(dt: datetime) -> str:
         return "no due date"
 
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
 def from_iso8601(date_str: str) -> datetime:
     """Converts ISO8601 string to datetime object in local timezone
 
@@ -78,13 +119,20 @@ def from_iso8601(date_str: str) -> datetime:
     datetime
         datetime object, created from date str
     """
-    try:
-        return datetime.strptime(
-            date_str, ISO8601_DATE_FORMAT
-        ).replace(tzinfo=tz.tzutc()).astimezone(tz.tzlocal()).replace(second=0)
-    except TypeError:
+    if date_str is None:
         return None
 
+    # fast path for canvas "YYYY-MM-DDTHH:MM:SSZ" strings
+    if len(date_str) == 20 and date_str[-1] == "Z":
+        try:
+            dt = datetime.fromisoformat(date_str[:-1])
+        except ValueError:
+            dt = datetime.strptime(date_str, ISO8601_DATE_FORMAT)
+    else:
+        dt = datetime.strptime(date_str, ISO8601_DATE_FORMAT)
+
+    return dt.replace(tzinfo=UTC_TZ).astimezone(LOCAL_TZ).replace(second=0)
+
 
 def max_time() -> datetime:
     """Returns max time datetime object
@@ -94,4 +142,4 @@ def max_time() -> datetime:
     datetime
         max time datetime object
     """
-    return datetime.max.replace(tzinfo=tz.tzutc())
+    return MAX_TIME
@@ -1,23 +1,159 @@
-from canvas_todo import config, canvas_todo
+import os
+import importlib
+from time import perf_counter
+from typing import Dict
+
+from canvas_todo.config.config_paths import CONF_DIR, PROFILES_DIR
+
+
+# heavy third party dependencies, timed separately by --profile-startup
+PROFILED_IMPORTS = ["yaml", "keyring", "requests", "canvasapi", "gkeepapi", "colored"]
+
+
+def timed_import(name: str, import_times: Dict[str, float]):
+    """Imports module, recording time taken
+
+    Parameters
+    ----------
+    name : str
+        module name
+    import_times : Dict[str, float]
+        import times, keyed by module name
+    """
+    start = perf_counter()
+    module = importlib.import_module(name)
+    import_times[name] = perf_counter() - start
+
+    return module
+
+
+def print_startup_profile(import_times: Dict[str, float], init_times: Dict[str, float]):
+    """Prints breakdown of startup time
+
+    Parameters
+    ----------
+    import_times : Dict[str, float]
+        import times, keyed by module name
+    init_times : Dict[str, float]
+        initialization step times, keyed by step name
+    """
+    print("Startup profile:")
+    for section, times in (("import", import_times), ("init", init_times)):
+        for name, elapsed in times.items():
+            print(f"  {section:<7}{name:<32}{1e3 * elapsed:>10.1f} ms")
 
 
 if __name__ == "__main__":
-    
+
     import argparse
 
-    parser = argparse.ArgumentParser()    
+    parser = argparse.ArgumentParser()
     parser.add_argument(
         "command",
-        help="command to execute (config, run, ... <TODO>"
+        help="command to execute (config, run, daemon, send-event)"
+    )
+    parser.add_argument(
+        "--profile",
+        help="account profile to configure or run, stored in .config/profiles/<profile>"
+    )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="run every account in one event loop in daemon mode"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="number of worker threads shared by all accounts in daemon mode [default: 4]"
+    )
+    parser.add_argument(
+        "--shared-cache-age",
+        type=float,
+        help="seconds course assignments are shared by accounts of a host in daemon mode "
+             "[default: not shared]"
+    )
+    parser.add_argument(
+        "--course-id",
+        type=int,
+        help="ID of course to send event about with send-event"
+    )
+    parser.add_argument(
+        "--assignment-id",
+        type=int,
+        help="ID of assignment to send event about with send-event"
+    )
+    parser.add_argument(
+        "--event",
+        default="assignment_updated",
+        help="name of event to send with send-event [default: assignment_updated]"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print breakdown of import and initialization time"
     )
 
     args = parser.parse_args()
 
+    # get config directory of account
+    conf_dir = CONF_DIR if args.profile is None else os.path.join(PROFILES_DIR, args.profile)
+
+    # time heavy imports up front, so module import times below exclude them
+    import_times, init_times = {}, {}
+    if args.profile_startup:
+        for name in PROFILED_IMPORTS:
+            timed_import(name, import_times)
+
     # configure canvas todo app
     if args.command == "config":
-        config.gen_config()
+        config = timed_import("canvas_todo.config.gen_config", import_times)
+        config.gen_config(conf_dir)
 
     # run canvas todo app
     elif args.command == "run":
-        c_todo = canvas_todo.CanvasTodo()
+        canvas_todo = timed_import("canvas_todo.canvas_todo", import_times)
+
+        c_todo = canvas_todo.CanvasTodo(conf_dir)
+        init_times.update(c_todo.init_times)
+
+        if args.profile_startup:
+            print_startup_profile(import_times, init_times)
+
         c_todo.run()
+
+    # run canvas todo app for every account profile
+    elif args.command == "daemon":
+        daemon = timed_import("canvas_todo.daemon", import_times)
+
+        start = perf_counter()
+        c_todo_daemon = daemon.Daemon(PROFILES_DIR, args.workers, args.shared_cache_age)
+        init_times["daemon"] = perf_counter() - start
+        for name, account in c_todo_daemon.accounts.items():
+            init_times.update({
+                f"{name}/{step}": elapsed for step, elapsed in account.init_times.items()
+            })
+
+        if args.profile_startup:
+            print_startup_profile(import_times, init_times)
+
+        if args.asyncio:
+            import asyncio
+            asyncio.run(c_todo_daemon.run_async())
+        else:
+            c_todo_daemon.run()
+
+    # send canvas event to push mode receiver of account, standing in for canvas
+    elif args.command == "send-event":
+        get_config = timed_import("canvas_todo.config.get_config", import_times)
+        events = timed_import("canvas_todo.events", import_times)
+
+        push_conf = get_config.get_app_config(conf_dir).get("push_conf", {})
+        status = events.send_event(
+            f"http://{push_conf.get('host', '127.0.0.1')}:{push_conf.get('port', 8765)}/",
+            args.course_id,
+            args.assignment_id,
+            args.event,
+            push_conf.get("secret")
+        )
+        print(f"Sent {args.event} event, receiver responded {status}")
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+from canvas_todo.diff import diff_course_tasks
+from canvas_todo.todo import Task, Completed, Update
+
+
+WEEK_1 = datetime(2026, 11, 2, 9, tzinfo=timezone.utc)
+WEEK_2 = datetime(2026, 11, 9, 9, tzinfo=timezone.utc)
+
+
+def non_empty(updates):
+    return {update: tasks for update, tasks in updates.items() if len(tasks) > 0}
+
+
+def test_unchanged_tasks_have_no_updates():
+    tasks = [Task("Essay", WEEK_1, Completed.INCOMPLETE), Task("Reading", None, Completed.UNKNOWN)]
+
+    assert non_empty(diff_course_tasks(tasks, list(tasks))) == {}
+
+
+def test_completed_state_synced():
+    todo = [Task("Essay", WEEK_1, Completed.INCOMPLETE), Task("Lab", WEEK_2, Completed.COMPLETE)]
+    canvas = [Task("Essay", WEEK_1, Completed.COMPLETE), Task("Lab", WEEK_2, Completed.INCOMPLETE)]
+
+    assert non_empty(diff_course_tasks(todo, canvas)) == {
+        Update.MARK_COMPLETE: [canvas[0]],
+        Update.MARK_INCOMPLETE: [canvas[1]]
+    }
+
+
+def test_duplicate_keys_matched_one_to_one():
+    todo = [Task("Quiz", WEEK_1, Completed.COMPLETE), Task("Quiz", WEEK_1, Completed.INCOMPLETE)]
+    canvas = [Task("Quiz", WEEK_1, Completed.INCOMPLETE), Task("Quiz", WEEK_1, Completed.COMPLETE)]
+
+    # each canvas task pairs with the todo task of the same completed-ness
+    assert non_empty(diff_course_tasks(todo, canvas)) == {}
+
+
+def test_duplicate_key_missing_from_todo_is_added():
+    todo = [Task("Quiz", WEEK_1, Completed.INCOMPLETE)]
+    canvas = [Task("Quiz", WEEK_1, Completed.INCOMPLETE)] * 2
+
+    assert non_empty(diff_course_tasks(todo, canvas)) == {Update.ADD: [canvas[1]]}
+
+
+def test_duplicate_key_missing_from_canvas_is_removed():
+    todo = [Task("Quiz", WEEK_1, Completed.COMPLETE), Task("Quiz", WEEK_1, Completed.INCOMPLETE)]
+    canvas = [Task("Quiz", WEEK_1, Completed.INCOMPLETE)]
+
+    assert non_empty(diff_course_tasks(todo, canvas)) == {Update.REMOVE: [todo[0]]}
+
+
+def test_changed_due_date():
+    todo = [Task("Essay", WEEK_1, Completed.INCOMPLETE)]
+    canvas = [Task("Essay", WEEK_2, Completed.INCOMPLETE)]
+
+    assert non_empty(diff_course_tasks(todo, canvas)) == {
+        Update.CHANGE_DUE_DATE: [(todo[0], canvas[0])]
+    }
+
+
+def test_renamed():
+    todo = [Task("Essay", WEEK_1, Completed.INCOMPLETE)]
+    canvas = [Task("Essay (revised)", WEEK_1, Completed.INCOMPLETE)]
+
+    assert non_empty(diff_course_tasks(todo, canvas)) == {Update.RENAME: [(todo[0], canvas[0])]}
+
+
+def test_added_and_removed():
+    todo = [Task("Essay", WEEK_1, Completed.INCOMPLETE)]
+    canvas = [Task("Lab", WEEK_2, Completed.INCOMPLETE)]
+
+    assert non_empty(diff_course_tasks(todo, canvas)) == {
+        Update.ADD: [canvas[0]],
+        Update.REMOVE: [todo[0]]
+    }
+
+
+def test_exact_match_preferred_over_rename():
+    todo = [Task("Essay", WEEK_1, Completed.INCOMPLETE), Task("Lab", WEEK_1, Completed.INCOMPLETE)]
+    canvas = [Task("Lab", WEEK_1, Completed.INCOMPLETE)]
+
+    assert non_empty(diff_course_tasks(todo, canvas)) == {Update.REMOVE: [todo[0]]}
@@ -0,0 +1,119 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.fakes import FakeKeep
+from canvas_todo.diff import diff_course_tasks
+from canvas_todo.todo import Task, Completed, Update
+
+
+COURSE_ID = 1000
+COURSES = {COURSE_ID: {"nickname": "Biology", "color": "DEFAULT"}}
+
+WEEK_1 = datetime(2026, 11, 2, 9, tzinfo=timezone.utc)
+WEEK_2 = datetime(2026, 11, 9, 9, tzinfo=timezone.utc)
+
+
+def sync(keep: FakeKeep, canvas_tasks, **conf):
+    """Runs one sync of course tasks, returning todo state afterwards
+    """
+    keep.conf = {"pin_notes": False, **conf}
+    todo_tasks = keep.request_todo_state(COURSES)[COURSE_ID]
+
+    keep.begin_post()
+    keep.post_course_state(
+        COURSE_ID, diff_course_tasks(todo_tasks, canvas_tasks), COURSES[COURSE_ID]
+    )
+    keep.flush()
+
+    return sorted(
+        (
+            (task.name, task.due_date, task.completed)
+            for task in keep.request_todo_state(COURSES)[COURSE_ID]
+        ),
+        key=lambda task: (task[0], task[1], task[2].value)
+    )
+
+
+def checked_items(keep: FakeKeep):
+    note = keep._find_note(COURSES[COURSE_ID]["nickname"])
+    return sorted((item.text, item.checked) for item in note.items)
+
+
+@pytest.fixture
+def keep() -> FakeKeep:
+    return FakeKeep()
+
+
+def test_duplicate_items_kept_one_to_one(keep):
+    canvas = [Task("Quiz", WEEK_1, Completed.INCOMPLETE)] * 2
+    sync(keep, canvas)
+
+    # completing one of two identical tasks checks exactly one item
+    canvas[0] = Task("Quiz", WEEK_1, Completed.COMPLETE)
+    sync(keep, canvas)
+    assert [checked for _, checked in checked_items(keep)] == [False, True]
+
+    # a steady state writes nothing
+    sync(keep, canvas)
+    assert keep.items_written == 0
+
+
+def test_pop_item_prefers_item_of_task_state(keep):
+    sync(keep, [
+        Task("Quiz", WEEK_1, Completed.COMPLETE), Task("Quiz", WEEK_1, Completed.INCOMPLETE),
+    ])
+    note = keep._find_note(COURSES[COURSE_ID]["nickname"])
+
+    assert keep._pop_item(note, Task("Quiz", WEEK_1, Completed.INCOMPLETE)).checked is False
+    assert keep._pop_item(note, Task("Quiz", WEEK_1, Completed.COMPLETE)).checked is True
+    assert keep._items(note) == {}
+
+
+def test_find_item_prefers_item_not_in_target_state(keep):
+    sync(keep, [
+        Task("Quiz", WEEK_1, Completed.COMPLETE), Task("Quiz", WEEK_1, Completed.INCOMPLETE),
+    ])
+    note = keep._find_note(COURSES[COURSE_ID]["nickname"])
+
+    assert keep._find_item(note, Task("Quiz", WEEK_1, Completed.COMPLETE), True).checked is False
+    assert keep._find_item(note, Task("Quiz", WEEK_1, Completed.INCOMPLETE), False).checked is True
+
+
+def test_removed_item_deleted(keep):
+    sync(keep, [
+        Task("Essay", WEEK_1, Completed.INCOMPLETE), Task("Lab", WEEK_2, Completed.INCOMPLETE)
+    ])
+
+    assert sync(keep, [Task("Lab", WEEK_2, Completed.INCOMPLETE)]) == [
+        ("Lab", WEEK_2, Completed.INCOMPLETE)
+    ]
+
+
+def test_incomplete_not_unchecked_by_default(keep):
+    sync(keep, [Task("Worksheet", WEEK_1, Completed.COMPLETE)])
+
+    assert sync(keep, [Task("Worksheet", WEEK_1, Completed.INCOMPLETE)]) == [
+        ("Worksheet", WEEK_1, Completed.COMPLETE)
+    ]
+    canvas = [Task("Worksheet", WEEK_1, Completed.INCOMPLETE)]
+    assert sync(keep, canvas, uncheck_incomplete=True) == [
+        ("Worksheet", WEEK_1, Completed.INCOMPLETE)
+    ]
+
+
+def test_redated_item_takes_canvas_state(keep):
+    # last week's submitted quiz leaves the results as next week's enters them
+    sync(keep, [Task("Reading Quiz", WEEK_1, Completed.COMPLETE)])
+
+    assert sync(keep, [Task("Reading Quiz", WEEK_2, Completed.INCOMPLETE)]) == [
+        ("Reading Quiz", WEEK_2, Completed.INCOMPLETE)
+    ]
+
+
+def test_renamed_item_keeps_unknown_state(keep):
+    sync(keep, [Task("Reading", WEEK_1, Completed.COMPLETE)])
+
+    assert sync(keep, [Task("Reading (ch. 2)", WEEK_1, Completed.UNKNOWN)]) == [
+        ("Reading (ch. 2)", WEEK_1, Completed.COMPLETE)
+    ]
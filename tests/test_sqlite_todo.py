@@ -0,0 +1,94 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from canvas_todo.diff import diff_course_tasks
+from canvas_todo.todo import Task, Completed
+from canvas_todo.todo.sqlite_todo import SqliteTodo
+
+
+COURSE_ID = 1000
+COURSES = {COURSE_ID: {"nickname": "Biology", "color": "DEFAULT"}}
+
+WEEK_1 = datetime(2026, 11, 2, 9, tzinfo=timezone.utc)
+WEEK_2 = datetime(2026, 11, 9, 9, tzinfo=timezone.utc)
+
+
+def sync(todo: SqliteTodo, canvas_tasks):
+    """Runs one sync of course tasks, returning todo state afterwards
+    """
+    todo_tasks = todo.request_todo_state(COURSES)[COURSE_ID]
+
+    todo.begin_post()
+    todo.post_course_state(
+        COURSE_ID, diff_course_tasks(todo_tasks, canvas_tasks), COURSES[COURSE_ID]
+    )
+    todo.flush()
+
+    return sorted(
+        (
+            (task.name, task.due_date, task.completed)
+            for task in todo.request_todo_state(COURSES)[COURSE_ID]
+        ),
+        key=lambda task: (task[0], task[1], task[2].value)
+    )
+
+
+@pytest.fixture
+def todo(tmp_path) -> SqliteTodo:
+    return SqliteTodo(str(tmp_path / "todo.db"))
+
+
+def test_duplicate_tasks_kept_one_to_one(todo):
+    canvas = [Task("Quiz", WEEK_1, Completed.INCOMPLETE)] * 2
+    assert len(sync(todo, canvas)) == 2
+
+    # completing one of two identical tasks checks exactly one item
+    canvas[0] = Task("Quiz", WEEK_1, Completed.COMPLETE)
+    assert sync(todo, canvas) == [
+        ("Quiz", WEEK_1, Completed.INCOMPLETE), ("Quiz", WEEK_1, Completed.COMPLETE)
+    ]
+
+    # a steady state writes nothing
+    sync(todo, canvas)
+    assert todo.items_written == 0
+
+
+def test_duplicate_task_removed_once(todo):
+    sync(todo, [
+        Task("Quiz", WEEK_1, Completed.COMPLETE), Task("Quiz", WEEK_1, Completed.INCOMPLETE)
+    ])
+
+    assert sync(todo, [Task("Quiz", WEEK_1, Completed.INCOMPLETE)]) == [
+        ("Quiz", WEEK_1, Completed.INCOMPLETE)
+    ]
+
+
+def test_redated_duplicate_updates_one_item(todo):
+    sync(todo, [Task("Quiz", WEEK_1, Completed.INCOMPLETE)] * 2)
+
+    canvas = [
+        Task("Quiz", WEEK_1, Completed.INCOMPLETE), Task("Quiz", WEEK_2, Completed.INCOMPLETE)
+    ]
+    assert sync(todo, canvas) == [
+        ("Quiz", WEEK_1, Completed.INCOMPLETE), ("Quiz", WEEK_2, Completed.INCOMPLETE)
+    ]
+
+
+def test_items_of_older_schema_migrated(tmp_path):
+    path = str(tmp_path / "todo.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE items (course_id INTEGER, name TEXT, due_date TEXT NOT NULL, "
+            "checked INTEGER, PRIMARY KEY (course_id, name, due_date))"
+        )
+        conn.execute("INSERT INTO items VALUES (?, ?, ?, ?)", (COURSE_ID, "Essay", "", 1))
+    conn.close()
+
+    todo = SqliteTodo(path)
+
+    assert todo.request_todo_state(COURSES) == {
+        COURSE_ID: [Task("Essay", None, Completed.COMPLETE)]
+    }
+    assert len(sync(todo, [Task("Essay", None, Completed.COMPLETE)] * 2)) == 2
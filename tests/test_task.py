@@ -0,0 +1,25 @@
+import copy
+import pickle
+from datetime import datetime, timezone
+
+import pytest
+
+from canvas_todo.todo import Task, Completed
+
+
+@pytest.mark.parametrize("due_date", [datetime(2026, 11, 1, tzinfo=timezone.utc), None])
+@pytest.mark.parametrize(
+    "round_trip",
+    [copy.copy, copy.deepcopy, lambda task: pickle.loads(pickle.dumps(task))],
+    ids=["copy", "deepcopy", "pickle"]
+)
+def test_task_round_trip(round_trip, due_date):
+    task = Task("Homework 1", due_date, Completed.COMPLETE)
+    task.todo_str()
+
+    restored = round_trip(task)
+
+    assert restored == task
+    assert hash(restored) == hash(task)
+    assert restored.sort_key == task.sort_key
+    assert restored.todo_str() == task.todo_str()
@@ -0,0 +1,92 @@
+from typing import List, Tuple
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from canvas_todo.transport import CanvasSession
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Adapter answering each request with the next scripted status code
+    """
+    def __init__(self, statuses: List[int]):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.sent: List[Tuple[str, str]] = []
+
+    def send(self, request, **kwargs) -> requests.Response:
+        self.sent.append((request.method, request.url))
+
+        response = requests.Response()
+        response.status_code = self.statuses.pop(0)
+        response.headers["X-Rate-Limit-Remaining"] = "500"
+        response.request = request
+        response.url = request.url
+        response._content = b"{}"
+        return response
+
+    def close(self):
+        pass
+
+
+def make_session(statuses: List[int]) -> Tuple[CanvasSession, ScriptedAdapter]:
+    # no backoff or refill wait, so retries don't sleep
+    session = CanvasSession(max_retries=3, backoff_base=0, low_water=0)
+    adapter = ScriptedAdapter(statuses)
+    session.mount("https://", adapter)
+    return session, adapter
+
+
+def test_request_ok():
+    session, adapter = make_session([200])
+
+    response = session.request(
+        "GET", "https://canvas.test/api/v1/courses", headers={"Authorization": "Bearer x"}
+    )
+
+    assert response.status_code == 200
+    assert len(adapter.sent) == 1
+    assert session.retries == 0
+    assert session.limiter({"Authorization": "Bearer x"}).remaining == 500
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_request_retries_throttled(method):
+    session, adapter = make_session([429, 200])
+
+    response = session.request(
+        method, "https://canvas.test/api/v1/courses", headers={"Authorization": "Bearer x"}
+    )
+
+    assert response.status_code == 200
+    assert len(adapter.sent) == 2
+    assert (session.retries, session.throttled) == (1, 1)
+
+
+def test_request_retries_server_error_of_idempotent_method():
+    session, adapter = make_session([503, 503, 200])
+
+    response = session.request("GET", "https://canvas.test/api/v1/courses")
+
+    assert response.status_code == 200
+    assert len(adapter.sent) == 3
+
+
+def test_request_does_not_retry_server_error_of_post():
+    session, adapter = make_session([502, 200])
+
+    response = session.request("POST", "https://canvas.test/api/v1/courses")
+
+    assert response.status_code == 502
+    assert len(adapter.sent) == 1
+    assert session.retries == 0
+
+
+def test_request_gives_up_after_max_retries():
+    session, adapter = make_session([500] * 4)
+
+    response = session.request("GET", "https://canvas.test/api/v1/courses")
+
+    assert response.status_code == 500
+    assert len(adapter.sent) == 4